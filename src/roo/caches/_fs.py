@@ -0,0 +1,36 @@
+"""Filesystem helpers shared by the caches."""
+import contextlib
+import os
+import pathlib
+import secrets
+from typing import Iterator, BinaryIO
+
+
+@contextlib.contextmanager
+def atomic_writer(path: pathlib.Path) -> Iterator[BinaryIO]:
+    """Context manager returning a file whose content replaces the file at
+    path atomically when the context exits without errors. The file is
+    written next to path, then renamed in place.
+
+    Unlike atomicwrites, we don't fsync. These are small files that we can
+    always regenerate, so the fsync cost is not worth it.
+    """
+    # The random part keeps concurrent threads of the same process apart.
+    tmp_path = path.with_suffix(
+        path.suffix + f".tmp.{os.getpid()}.{secrets.token_hex(5)}")
+    try:
+        with open(tmp_path, "wb") as f:
+            yield f
+        os.replace(tmp_path, path)
+    except BaseException:
+        try:
+            os.unlink(tmp_path)
+        except FileNotFoundError:
+            pass
+        raise
+
+
+def atomic_write_bytes(path: pathlib.Path, data: bytes) -> None:
+    """Writes data to path atomically. See atomic_writer."""
+    with atomic_writer(path) as f:
+        f.write(data)
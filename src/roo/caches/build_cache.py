@@ -1,4 +1,7 @@
+import gzip
 import logging
+import re
+import secrets
 import tarfile
 import shutil
 import pathlib
@@ -7,9 +10,53 @@ import os
 from typing import List, Tuple, Optional
 import atomicwrites
 
+try:
+    import fcntl
+except ImportError:  # pragma: no cover
+    # Not available on Windows.
+    fcntl = None  # type: ignore
+
+try:
+    import zstandard
+except ImportError:  # pragma: no cover
+    zstandard = None  # type: ignore
+
+try:
+    import rapidgzip
+except ImportError:  # pragma: no cover
+    rapidgzip = None  # type: ignore
+
 
 logger = logging.getLogger(__name__)
 
+# Suffixes for the cached builds.
+# When the build and the cache are on the same filesystem, builds are kept
+# as plain directories, as no compression is faster than any compression.
+# Otherwise, we use archives. zstd is used when available, as it
+# is much faster than gzip to decompress. gzip archives are still recognised
+# so that caches created before (or without zstandard) keep working.
+_DIR_SUFFIX = ".d"
+_ZST_SUFFIX = ".tar.zst"
+_GZ_SUFFIX = ".tar.gz"
+
+# Splits a build filename into name, version and suffix in a single pass.
+_BUILD_FILENAME_RE = re.compile(r"^(.+)_([^_]+)(\.d|\.tar\.zst|\.tar\.gz)$")
+
+# Below this size, setting up parallel gzip decompression costs more than
+# what it saves, so plain gzip is used instead.
+_PARALLEL_GZIP_MIN_SIZE = 4 * 1024 * 1024
+
+# Buffer size used by tarfile to copy file contents in and out of the
+# archives. The tarfile defaults (10-16 KiB) result in a very large number
+# of small reads and writes for big builds.
+_COPY_BUFSIZE = 2 * 1024 * 1024
+
+# Compression level for gzip archives, when zstandard is not available.
+_GZIP_COMPRESSLEVEL = 3
+
+# ioctl request to clone a file on copy-on-write filesystems (linux/fs.h)
+_FICLONE = 0x40049409
+
 
 class BuildCache:
     """
@@ -27,6 +74,7 @@ class BuildCache:
         self.root_dir = root_dir
         self.r_version = r_version
         self.platform = platform
+        self._base_dir_created = False
 
     # all computed directories
     @property
@@ -38,7 +86,9 @@ class BuildCache:
 
         """
         path = self.root_dir / "build" / self.r_version / self.platform
-        path.mkdir(parents=True, exist_ok=True)
+        if not self._base_dir_created:
+            path.mkdir(parents=True, exist_ok=True)
+            self._base_dir_created = True
         return path
 
     def has_build(self, package_name: str, package_version: str) -> bool:
@@ -52,9 +102,7 @@ class BuildCache:
         Returns: true if available. False otherwise.
 
         """
-        pkg_path = self._package_filename(package_name, package_version)
-
-        return pkg_path.exists()
+        return self._find_build(package_name, package_version) is not None
 
     def add_build(self,
                   package_name: str,
@@ -71,14 +119,37 @@ class BuildCache:
         Returns: the path of the added package
 
         """
-        logger.info(f"Adding {path} to {package_name} {package_version}")
-        pkg_path = self._package_filename(package_name, package_version)
+        logger.info("Adding %s to %s %s", path, package_name, package_version)
+        if _same_filesystem(path, self.base_dir):
+            return self._add_build_dir(package_name, package_version, path)
+
+        pkg_path = self._package_filename(
+            package_name, package_version, _archive_suffix())
 
         try:
             with atomicwrites.atomic_write(
                     pkg_path, mode="wb", overwrite=True) as f:
-                with tarfile.open(fileobj=f, mode="w:gz") as targz:
-                    targz.add(str(path), arcname=".")
+                if zstandard is None:
+                    # A fixed mtime keeps the archive reproducible, and
+                    # level 3 is several times faster than the default 9
+                    # for a slightly larger archive.
+                    with gzip.GzipFile(
+                            fileobj=f, mode="wb",
+                            compresslevel=_GZIP_COMPRESSLEVEL,
+                            mtime=0) as gz:
+                        with tarfile.open(  # type: ignore
+                                fileobj=gz, mode="w|",
+                                bufsize=_COPY_BUFSIZE,
+                                copybufsize=_COPY_BUFSIZE) as tar:
+                            tar.add(str(path), arcname=".")
+                else:
+                    compressor = zstandard.ZstdCompressor(level=3, threads=-1)
+                    with compressor.stream_writer(f, closefd=False) as zst:
+                        with tarfile.open(  # type: ignore
+                                fileobj=zst, mode="w|",
+                                bufsize=_COPY_BUFSIZE,
+                                copybufsize=_COPY_BUFSIZE) as tar:
+                            tar.add(str(path), arcname=".")
         except FileExistsError:
             # A concurrent process has built the same thing and got there
             # first.
@@ -104,21 +175,38 @@ class BuildCache:
         """
 
         logger.info(
-            f"Restoring cached installation "
-            f"{package_name} {package_version} to {destination}")
-
-        pkg_path = self._package_filename(package_name, package_version)
+            "Restoring cached installation %s %s to %s",
+            package_name, package_version, destination)
 
-        shutil.rmtree(destination, ignore_errors=True)
-
-        try:
-            with tarfile.open(pkg_path, "r:gz") as targz:
-                targz.extractall(str(destination))
-        except FileNotFoundError:
+        pkg_path = self._find_build(package_name, package_version)
+        if pkg_path is None:
             raise FileNotFoundError(
                 f"Unable to restore build {package_name} {package_version} "
                 f"for R version {self.r_version}"
-            ) from None
+            )
+
+        shutil.rmtree(destination, ignore_errors=True)
+
+        if pkg_path.name.endswith(_DIR_SUFFIX):
+            shutil.copytree(
+                pkg_path, destination,
+                symlinks=True, copy_function=_clone_or_copy)
+        elif pkg_path.name.endswith(_ZST_SUFFIX):
+            decompressor = zstandard.ZstdDecompressor()
+            with open(pkg_path, "rb") as f, \
+                    decompressor.stream_reader(f) as zst:
+                with tarfile.open(  # type: ignore
+                        fileobj=zst, mode="r|",
+                        bufsize=_COPY_BUFSIZE,
+                        copybufsize=_COPY_BUFSIZE) as tar:
+                    tar.extractall(str(destination))
+        else:
+            with _open_gzip(pkg_path) as gz:
+                with tarfile.open(  # type: ignore
+                        fileobj=gz, mode="r|",
+                        bufsize=_COPY_BUFSIZE,
+                        copybufsize=_COPY_BUFSIZE) as tar:
+                    tar.extractall(str(destination))
 
     def clear_build(
             self, package_name: str, package_version: Optional[str] = None):
@@ -126,66 +214,199 @@ class BuildCache:
         Clears the given build for package identified by package_name and
         package_version
         """
-        entries_to_delete = []
+        base_dir = self.base_dir
+
+        paths_to_delete: List[str] = []
         if package_version is None:
-            entries_to_delete = [
-                x for x in self.list_builds() if x[0] == package_name
+            paths_to_delete = [
+                path for name, _, path in self._scan_builds()
+                if name == package_name
             ]
         else:
-            entries_to_delete = [(package_name, package_version)]
+            paths_to_delete = [
+                str(base_dir / f"{package_name}_{package_version}{suffix}")
+                for suffix in _build_suffixes()
+            ]
 
-        for name, version in entries_to_delete:
-            logger.info(
-                f"Clearing cached build {name} {version}")
+        for path in paths_to_delete:
+            logger.info("Clearing cached build %s", path)
 
-            pkg_path = self._package_filename(name, version)
-            if pkg_path.exists():
-                pkg_path.unlink()
+            try:
+                if path.endswith(_DIR_SUFFIX):
+                    shutil.rmtree(path)
+                else:
+                    os.unlink(path)
+            except FileNotFoundError:
+                pass
 
     def list_builds(self) -> List[Tuple[str, str]]:
-        builds = []
-        for entry in os.scandir(self.base_dir):
-            if entry.name.endswith(".tar.gz"):
-                name, version = _split_package_filename(entry.name)
-                builds.append((name, version))
-
-        return builds
+        return [(name, version) for name, version, _ in self._scan_builds()]
 
     def clear(self):
         """Clear all builds and removes the whole cache."""
         shutil.rmtree(self.base_dir)
+        self._base_dir_created = False
+
+    def _scan_builds(self) -> List[Tuple[str, str, str]]:
+        """
+        Scans the cache for builds.
+
+        Returns: a list of (name, version, path) for each build.
+        """
+        builds = []
+        match = _BUILD_FILENAME_RE.match
+        with os.scandir(self.base_dir) as it:
+            for entry in it:
+                m = match(entry.name)
+                if m is not None:
+                    builds.append((m.group(1), m.group(2), entry.path))
+
+        return builds
+
+    def _add_build_dir(self,
+                       package_name: str,
+                       package_version: str,
+                       path: pathlib.Path) -> pathlib.Path:
+        """
+        Adds a build directory to the cache as an uncompressed directory.
+
+        Args:
+            package_name: the name of the package
+            package_version: the version of the package
+            path: the path of the build directory
+
+        Returns: the path of the added build
+        """
+        pkg_path = self._package_filename(
+            package_name, package_version, _DIR_SUFFIX)
+
+        # Copy to a private staging directory first, then rename it in
+        # place, so that concurrent processes never see a partial build.
+        staging_path = self._package_filename(
+            package_name, package_version,
+            f".{secrets.token_hex(5)}.partial")
+
+        shutil.copytree(
+            path, staging_path,
+            symlinks=True, copy_function=_clone_or_copy)
+
+        try:
+            os.rename(staging_path, pkg_path)
+        except OSError:
+            # A concurrent process has built the same thing and got there
+            # first.
+            shutil.rmtree(staging_path, ignore_errors=True)
+
+        return pkg_path
 
     def _package_filename(
             self,
             package_name: str,
-            package_version: str) -> pathlib.Path:
+            package_version: str,
+            suffix: str) -> pathlib.Path:
         """
         Returns the filename of the build.
 
         Args:
             package_name: the name of the package
             package_version: the version of the package
+            suffix: the suffix for the type of build storage
 
         Returns: the path of the filename
 
         """
-        return self.base_dir / f"{package_name}_{package_version}.tar.gz"
+        return self.base_dir / f"{package_name}_{package_version}{suffix}"
+
+    def _find_build(
+            self,
+            package_name: str,
+            package_version: str) -> Optional[pathlib.Path]:
+        """
+        Returns the path of the existing build archive, in any of the
+        supported formats, or None if the build is not in the cache.
+
+        Args:
+            package_name: the name of the package
+            package_version: the version of the package
+
+        Returns: the path of the archive, or None if not found.
+
+        """
+        for suffix in _build_suffixes():
+            pkg_path = self._package_filename(
+                package_name, package_version, suffix)
+            if pkg_path.exists():
+                return pkg_path
+
+        return None
+
+
+def _open_gzip(path: pathlib.Path) -> typing.BinaryIO:
+    """Opens a gzip file for reading, decompressing it in parallel if
+    rapidgzip is available and the file is large enough to benefit from it.
+    """
+    if (rapidgzip is not None
+            and path.stat().st_size >= _PARALLEL_GZIP_MIN_SIZE):
+        return typing.cast(
+            typing.BinaryIO,
+            rapidgzip.open(str(path), parallelization=os.cpu_count()))
+
+    return typing.cast(typing.BinaryIO, gzip.GzipFile(path, "rb"))
+
+
+def _same_filesystem(path: pathlib.Path, other: pathlib.Path) -> bool:
+    """Returns True if the two paths are on the same filesystem."""
+    return os.stat(path).st_dev == os.stat(other).st_dev
+
+
+def _clone_or_copy(src: str, dst: str) -> str:
+    """Copy function for shutil.copytree. Clones the file if the filesystem
+    supports it (e.g. btrfs, XFS), which is instantaneous and takes no
+    space. Otherwise, performs a regular copy."""
+    if fcntl is not None:
+        try:
+            with open(src, "rb") as fsrc, open(dst, "wb") as fdst:
+                fcntl.ioctl(fdst.fileno(), _FICLONE, fsrc.fileno())
+            shutil.copystat(src, dst)
+            return dst
+        except OSError:
+            pass
+
+    return typing.cast(str, shutil.copy2(src, dst))
+
+
+def _archive_suffix() -> str:
+    """Returns the suffix of the archive format used for new builds."""
+    if zstandard is None:
+        return _GZ_SUFFIX
+    return _ZST_SUFFIX
 
 
-def _split_package_filename(filename: str) -> Tuple[str, str]:
-    return typing.cast(
-        Tuple[str, str],
-        tuple(filename.rsplit(".", maxsplit=2)[0].rsplit("_", maxsplit=1))
-    )
+def _build_suffixes() -> Tuple[str, ...]:
+    """Returns the build suffixes that can be handled, in order of
+    preference."""
+    if zstandard is None:
+        return (_DIR_SUFFIX, _GZ_SUFFIX)
+    return (_DIR_SUFFIX, _ZST_SUFFIX, _GZ_SUFFIX)
 
 
-def all_build_caches(root_dir: Optional[pathlib.Path] = None) -> List:
+def all_build_caches(
+        root_dir: Optional[pathlib.Path] = None) -> List[BuildCache]:
     if root_dir is None:
         root_dir = pathlib.Path("~/.roo/cache").expanduser()
 
     caches = []
-    for r_version in (x for x in (root_dir / "build").iterdir() if x.is_dir()):
-        for platform in (x for x in r_version.iterdir() if x.is_dir()):
-            caches.append(BuildCache(r_version.name, platform.name, root_dir))
+    try:
+        with os.scandir(root_dir / "build") as r_versions:
+            for r_version in r_versions:
+                if not r_version.is_dir():
+                    continue
+                with os.scandir(r_version.path) as platforms:
+                    for platform in platforms:
+                        if platform.is_dir():
+                            caches.append(BuildCache(
+                                r_version.name, platform.name, root_dir))
+    except FileNotFoundError:
+        pass
 
     return caches
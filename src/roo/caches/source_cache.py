@@ -1,14 +1,28 @@
-import string
-import random
+import gzip
+import io
+import secrets
 import tarfile
 import hashlib
 import shutil
 import pathlib
-import atomicwrites
 import os
 import json
 from urllib.parse import urlparse
-from typing import Union, Optional, List
+from typing import Union, Optional, List, Set, Dict, Tuple, BinaryIO
+
+from ._fs import atomic_writer, atomic_write_bytes
+
+try:
+    import libarchive
+except ImportError:  # pragma: no cover
+    libarchive = None
+
+# Buffer size used when reading package tarballs. The gzip and tarfile
+# defaults are a few KiB, which fragments the reads considerably.
+_READ_BUFSIZE = 256 * 1024
+
+# Buffer size used when copying the DESCRIPTION file out of the tarball.
+_DESCRIPTION_BUFSIZE = 64 * 1024
 
 
 class SourceCache:
@@ -21,6 +35,8 @@ class SourceCache:
     become unavailable. Disk space is cheap nowadays anyway.
     We could optimise local access by using a symbolic link, but we still
     need to extract the DESCRIPTION file in the cache anyway.
+    We don't hard link it either: the cache would share the file with the
+    user, and it would change if the user rebuilt the package in place.
     """
 
     def __init__(self,
@@ -34,19 +50,43 @@ class SourceCache:
 
         self.root_dir = root_dir
         self.source_url = source_url
-        self.base_dir.mkdir(parents=True, exist_ok=True)
+
+        url = urlparse(self.source_url)
+        if url.netloc == "":
+            source_location = pathlib.Path("local")
+        else:
+            source_location = pathlib.Path("remote") / url.netloc
+
+        # The base dir never changes for a given source, so we compute
+        # it only once. The digest is only a filesystem safe fingerprint
+        # of the path, so we use the cheaper blake2b rather than sha256.
+        location_dir = self.root_dir / "source" / source_location
+        self._base_dir = location_dir / hashlib.blake2b(
+            url.path.encode("utf-8"), digest_size=16).hexdigest()
+
+        if not self._base_dir.exists():
+            _migrate_legacy_dir(
+                location_dir / hashlib.sha256(
+                    url.path.encode("utf-8")).hexdigest(),
+                self._base_dir)
+
+        # Directories we already created, so that we don't have to
+        # create them again every time they are requested.
+        self._created_dirs: Set[pathlib.Path] = set()
+
+        # Paths of the package file and of its DESCRIPTION, per
+        # (name, version). They are requested repeatedly during resolution.
+        self._package_paths: Dict[
+            Tuple[str, str], Tuple[pathlib.Path, pathlib.Path]] = {}
+
+        self._ensure_dir(self.base_dir)
         meta_path = self.base_dir.with_suffix(".json")
         if not meta_path.exists():
-            try:
-                with atomicwrites.atomic_write(meta_path, mode="w") as f:
-                    json.dump({
-                        "source_url": self.source_url,
-                    }, f)
-            except FileExistsError:
-                # If the file already exists at this point, it's
-                # likely that a concurrent process created it as well,
-                # so we just keep going.
-                pass
+            # If a concurrent process writes it as well, the content is
+            # the same, so it does not matter which one wins the replace.
+            atomic_write_bytes(meta_path, json.dumps({
+                "source_url": self.source_url,
+            }).encode("utf-8"))
 
     # all computed directories
 
@@ -57,18 +97,10 @@ class SourceCache:
 
         Returns: The base directory for the cache of that source
         """
-        url = urlparse(self.source_url)
-        if url.netloc == "":
-            source_location = pathlib.Path("local")
-        else:
-            source_location = pathlib.Path("remote") / url.netloc
-        return self.root_dir / "source" / source_location / \
-            hashlib.sha256(url.path.encode("utf-8")).hexdigest()
+        return self._base_dir
 
     def package_dir(self, package_name: str) -> pathlib.Path:
-        path = self.base_dir / package_name
-        path.mkdir(parents=True, exist_ok=True)
-        return path
+        return self._ensure_dir(self.base_dir / package_name)
 
     def package_meta_dir(self,
                          package_name: str,
@@ -84,9 +116,8 @@ class SourceCache:
             The path to the package meta directory
         """
         package_dir = self.package_dir(package_name)
-        path = package_dir / f"{package_name}_{package_version}.meta-info"
-        path.mkdir(parents=True, exist_ok=True)
-        return path
+        return self._ensure_dir(
+            package_dir / f"{package_name}_{package_version}.meta-info")
 
     def get_package_file(self,
                          package_name: str,
@@ -102,9 +133,7 @@ class SourceCache:
         Returns: the path of the package .tar.gz or None if not found.
 
         """
-        pkg_path = (
-            self.package_dir(package_name) /
-            f"{package_name}_{package_version}.tar.gz")
+        pkg_path, _ = self._package_paths_for(package_name, package_version)
 
         if pkg_path.exists():
             return pkg_path
@@ -125,44 +154,21 @@ class SourceCache:
         Returns: the path to the description file if available, otherwise None
 
         """
-        meta_dir = self.package_meta_dir(package_name, package_version)
+        pkg_path, description_path = self._package_paths_for(
+            package_name, package_version)
 
-        description_path = meta_dir / "DESCRIPTION"
         if description_path.exists():
             return description_path
 
-        pkg_path = (
-            self.package_dir(package_name) /
-            f"{package_name}_{package_version}.tar.gz"
-        )
-
+        self._ensure_dir(description_path.parent)
+        # If a concurrent process extracted it as well, the content is
+        # the same, so it does not matter which one wins the replace.
         try:
-            with tarfile.open(pkg_path) as tar:
-                names = tar.getnames()
-
-                # Gets the shortest member that ends with DESCRIPTION.
-                # This way we exclude DESCRIPTION files in subdirectories.
-                try:
-                    desc_name = sorted([
-                        x for x in names
-                        if x.endswith("DESCRIPTION")], key=len)[0]
-                except IndexError:
-                    raise ValueError("The package does not have a DESCRIPTION "
-                                     "file")
-
-                description = tar.extractfile(desc_name)
-                if description is None:
-                    raise ValueError("Unable to unpack DESCRIPTION file")
-
-                try:
-                    with atomicwrites.atomic_write(
-                            description_path, mode="wb") as f:
-                        f.write(description.read())
-                except FileExistsError:
-                    # If the file already exists at this point, it's
-                    # likely that a concurrent process created it as well,
-                    # so we just keep going.
-                    pass
+            with atomic_writer(description_path) as desc_file:
+                if libarchive is not None:
+                    _copy_description_libarchive(pkg_path, desc_file)
+                else:
+                    _copy_description_tarfile(pkg_path, desc_file)
         except FileNotFoundError:
             return None
 
@@ -190,43 +196,149 @@ class SourceCache:
         Returns: the path of the added package
 
         """
-        pkg_path = (
-            self.package_dir(package_name) /
-            f"{package_name}_{package_version}.tar.gz"
-        )
+        pkg_path, _ = self._package_paths_for(package_name, package_version)
 
         if pkg_path.exists():
             return pkg_path
 
-        letters = string.ascii_lowercase
-        append = ''.join(random.choice(letters) for i in range(10))
+        append = secrets.token_hex(5)
 
-        partial_pkg_path = (
-            self.package_dir(package_name) /
-            (f"{package_name}_{package_version}." + append)
-        )
+        partial_pkg_path = pkg_path.with_name(
+            f"{package_name}_{package_version}." + append)
 
         # first copy it locally so that we guarantee that atomic operations.
         # are not compromised by different filesystems.
         # If both processes do the copy it's not a problem because they
         # have different append strings.
-        shutil.copy(path, partial_pkg_path)
-
-        # Then perform the atomic move. Only one will succeed, the other
-        # will get a FileExistError and we'll keep going.
+        # We don't need the file metadata, so copyfile is enough.
+        shutil.copyfile(path, partial_pkg_path)
+
+        # Then perform the atomic move. If two processes get here, both
+        # files are the same package, so the last one to replace wins
+        # harmlessly. The replace can also fail because the other process
+        # placed it already (e.g. on Windows, if the file is in use).
+        # That is a success as well.
         try:
-            atomicwrites.move_atomic(str(partial_pkg_path), str(pkg_path))
-        except FileExistsError:
-            pass
+            os.replace(partial_pkg_path, pkg_path)
+        except OSError:
+            os.unlink(partial_pkg_path)
+            if not pkg_path.exists():
+                raise
 
         return pkg_path
 
-    def cached_package_names(self):
-        return [x.name for x in os.scandir(self.base_dir) if x.is_dir()]
+    def cached_package_names(self) -> List[str]:
+        with os.scandir(self.base_dir) as it:
+            return [x.name for x in it if x.is_dir()]
 
     def remove_package(self, package_name):
         pkg_dir = self.package_dir(package_name)
         shutil.rmtree(pkg_dir)
+        self._created_dirs.clear()
+        self._package_paths.clear()
+
+    def _package_paths_for(
+            self,
+            package_name: str,
+            package_version: str) -> Tuple[pathlib.Path, pathlib.Path]:
+        """Returns the paths of the package file and of its DESCRIPTION
+        file in the cache. Neither of them is guaranteed to exist."""
+        key = (package_name, package_version)
+        try:
+            return self._package_paths[key]
+        except KeyError:
+            pass
+
+        package_dir = self.package_dir(package_name)
+        basename = f"{package_name}_{package_version}"
+        paths = (
+            package_dir / (basename + ".tar.gz"),
+            package_dir / (basename + ".meta-info") / "DESCRIPTION",
+        )
+        self._package_paths[key] = paths
+        return paths
+
+    def _ensure_dir(self, path: pathlib.Path) -> pathlib.Path:
+        """Creates the directory at path, unless we already did it."""
+        if path not in self._created_dirs:
+            path.mkdir(parents=True, exist_ok=True)
+            self._created_dirs.add(path)
+        return path
+
+
+def _migrate_legacy_dir(legacy_dir: pathlib.Path,
+                        base_dir: pathlib.Path) -> None:
+    """Moves a cache created with the former sha256 based layout to
+    the new location, so that its content is not lost."""
+    if not legacy_dir.is_dir():
+        return
+
+    try:
+        os.rename(legacy_dir, base_dir)
+    except OSError:
+        # A concurrent process may have migrated it already.
+        return
+
+    try:
+        os.rename(legacy_dir.with_suffix(".json"),
+                  base_dir.with_suffix(".json"))
+    except FileNotFoundError:
+        pass
+
+
+def _copy_description_tarfile(pkg_path: pathlib.Path, out: BinaryIO):
+    """Writes the DESCRIPTION file of a package tarball to out,
+    using the standard library tarfile."""
+    with open(pkg_path, "rb", buffering=_READ_BUFSIZE) as raw, \
+            io.BufferedReader(
+                gzip.GzipFile(fileobj=raw),
+                buffer_size=_READ_BUFSIZE) as f, \
+            tarfile.open(fileobj=f, mode="r|") as tar:
+
+        # Gets the DESCRIPTION at the top level of the package.
+        # This way we exclude DESCRIPTION files in subdirectories.
+        # It is normally one of the first members, so we stop as
+        # soon as we find it instead of scanning the whole archive.
+        for member in tar:
+            if _is_toplevel_description(member.name):
+                fileobj = tar.extractfile(member)
+                if fileobj is None:
+                    raise ValueError("Unable to unpack DESCRIPTION file")
+                with fileobj:
+                    shutil.copyfileobj(fileobj, out, _DESCRIPTION_BUFSIZE)
+                return
+
+    raise ValueError("The package does not have a DESCRIPTION file")
+
+
+def _copy_description_libarchive(pkg_path: pathlib.Path, out: BinaryIO):
+    """Writes the DESCRIPTION file of a package tarball to out,
+    using libarchive, which is much faster than tarfile."""
+    with open(pkg_path, "rb") as f, \
+            libarchive.stream_reader(
+                f, format_name="tar", filter_name="gzip") as archive:
+        for entry in archive:
+            if _is_toplevel_description(entry.pathname):
+                if not entry.isfile:
+                    raise ValueError("Unable to unpack DESCRIPTION file")
+                for block in entry.get_blocks():
+                    out.write(block)
+                return
+
+    raise ValueError("The package does not have a DESCRIPTION file")
+
+
+def _is_toplevel_description(member_name: str) -> bool:
+    """Returns True if the tarball member name is the DESCRIPTION file of
+    the package, e.g. "stringi/DESCRIPTION"."""
+    if member_name.startswith("./"):
+        member_name = member_name[2:]
+
+    return (
+        member_name.count("/") <= 1
+        and (member_name == "DESCRIPTION"
+             or member_name.endswith("/DESCRIPTION"))
+    )
 
 
 def all_source_caches(
@@ -1,4 +1,4 @@
-from typing import Optional
+from typing import Optional, Dict, Set
 import tempfile
 import shutil
 import hashlib
@@ -6,7 +6,7 @@ import pathlib
 import logging
 from urllib.parse import urlparse
 
-logger = logging.getLogger(__file__)
+logger = logging.getLogger(__name__)
 
 
 class VCSStore:
@@ -18,41 +18,66 @@ class VCSStore:
 
         self.root_dir = root_dir
 
+        # Base directories already computed, by vcs url
+        self._base_dirs: Dict[str, pathlib.Path] = {}
+        # Base directories we already created
+        self._created_dirs: Set[pathlib.Path] = set()
+
     def base_dir(self, vcs_url: str) -> pathlib.Path:
         """
-        Returns the base directory for the cache for a given url
+        Returns the base directory for the cache for a given url.
+        The directory is not guaranteed to exist.
         """
-        path = self.root_dir / "vcs"
-        path.mkdir(parents=True, exist_ok=True)
-        url = urlparse(vcs_url)
-        return self.root_dir / "vcs" / url.netloc / hashlib.sha256(
-            url.path.encode("utf-8")).hexdigest()
+        base_dir = self._base_dirs.get(vcs_url)
+        if base_dir is None:
+            url = urlparse(vcs_url)
+            base_dir = self.root_dir / "vcs" / url.netloc / hashlib.sha256(
+                url.path.encode("utf-8")).hexdigest()
+            self._base_dirs[vcs_url] = base_dir
+
+        return base_dir
 
     def clone_dir(self, vcs_url: str, ref: Optional[str]) -> pathlib.Path:
-        """Returns the directory where to clone the given ref"""
-        if ref is None:
-            ref = "HEAD"
-        return self.base_dir(vcs_url) / ref
+        """Returns the directory where to clone the given ref.
+        Its parent directory is created if needed, but not the directory
+        itself."""
+        self._ensure_base_dir(vcs_url)
+        return self._clone_path(vcs_url, ref)
 
     def clear(self):
         """Clear the whole cache."""
-        logging.info(f"Clearing all vcs stores at {self.root_dir}")
+        logger.info("Clearing all vcs stores at %s", self.root_dir)
         try:
             shutil.rmtree(self.root_dir)
         except FileNotFoundError:
             pass
 
+        self._created_dirs.clear()
+
     def clear_clone(self, vcs_url: str, ref: Optional[str]):
         """Clear the specified clone reference. Does nothing if not present"""
         if ref is None:
             ref = "HEAD"
 
-        logging.info(
-            f"Clearing vcs store at {self.root_dir} "
-            f"for url {vcs_url} ref {ref}"
+        logger.info(
+            "Clearing vcs store at %s for url %s ref %s",
+            self.root_dir, vcs_url, ref
         )
 
         try:
-            shutil.rmtree(self.clone_dir(vcs_url, ref))
+            shutil.rmtree(self._clone_path(vcs_url, ref))
         except FileNotFoundError:
             pass
+
+    def _clone_path(self, vcs_url: str, ref: Optional[str]) -> pathlib.Path:
+        """Returns the clone directory path, without creating anything."""
+        if ref is None:
+            ref = "HEAD"
+        return self.base_dir(vcs_url) / ref
+
+    def _ensure_base_dir(self, vcs_url: str):
+        """Creates the base directory of the url, unless we already did."""
+        base_dir = self.base_dir(vcs_url)
+        if base_dir not in self._created_dirs:
+            base_dir.mkdir(parents=True, exist_ok=True)
+            self._created_dirs.add(base_dir)
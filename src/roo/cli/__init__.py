@@ -0,0 +1,81 @@
+import pathlib
+
+import click
+from roo.parsers.categories import ALL_DEPENDENCY_CATEGORIES
+
+# The project files, relative to the current directory.
+RPROJECT_PATH = pathlib.Path("rproject.toml")
+LOCK_PATH = pathlib.Path("roo.lock")
+
+# Shared by all the commands accepting a --category option.
+CATEGORY_CHOICE = click.Choice(ALL_DEPENDENCY_CATEGORIES)
+
+# Options shared by more than one command.
+BASE_DIR_OPTION = click.option(
+    "--base-dir",
+    help=("The base directory for the environments. "
+          "If not specified, use the current directory."),
+    type=click.Path(), default=".")
+
+_INSTALL_OPTIONS = [
+    click.option(
+        "--env-base-dir",
+        help="The environment base directory.",
+        type=click.Path(), default="."),
+    click.option(
+        "--env-name",
+        help="The name of the environment to create",
+        type=click.STRING, default=None),
+    click.option(
+        "--quiet",
+        help="Disables output",
+        is_flag=True, default=False),
+    click.option(
+        "--verbose-build",
+        help=(
+            "Enables verbose building process. "
+            "Useful to debug errors in the build."),
+        is_flag=True, default=False),
+    click.option(
+        "--env-overwrite",
+        help="Overwrite the environment if already existent",
+        is_flag=True, default=False),
+    click.option(
+        "--env-r-executable-path",
+        help=(
+            "The path to the R executable to use if a new"
+            " environment needs to be created. Ignored if the"
+            " environment already exists."
+        ),
+        type=click.Path(), default=None),
+    click.option(
+        "--category",
+        help=(
+            "Install the deps of the specified category. "
+            "Can be provided multiple times."),
+        multiple=True,
+        type=CATEGORY_CHOICE),
+    click.option(
+        "--serial",
+        help=(
+            "Perform downloading and installation serially."
+            " Slower but safer."
+        ),
+        is_flag=True,
+        default=False),
+    click.option(
+        "--use-vanilla",
+        help=(
+            "If specified, do not run any Renviron or Rprofile files."
+        ),
+        is_flag=True,
+        default=False),
+]
+
+
+def install_options(func):
+    """Adds the options common to the install and ci commands."""
+    # click collects the options bottom up.
+    for option in reversed(_INSTALL_OPTIONS):
+        func = option(func)
+    return func
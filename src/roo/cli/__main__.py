@@ -2,23 +2,27 @@ import logging
 
 import click
 
-from roo.cli.add import add
-from roo.cli.cache import cache
-from roo.cli.environment import environment
-from roo.cli.export import export
-from roo.cli.init import init
-from roo.cli.install import install
-from roo.cli.lock import lock
-from roo.cli.package import package
-from roo.cli.rswitch import rswitch
-from roo.cli.run import run
-from roo.cli.ci import ci
+from roo.cli.lazy_group import LazyGroup
 from roo.console import init_console
 
 logger = logging.getLogger(__file__)
 
 
-@click.group()
+@click.group(
+    cls=LazyGroup,
+    lazy_subcommands={
+        "init": ("roo.cli.init", "init"),
+        "environment": ("roo.cli.environment", "environment"),
+        "package": ("roo.cli.package", "package"),
+        "lock": ("roo.cli.lock", "lock"),
+        "install": ("roo.cli.install", "install"),
+        "cache": ("roo.cli.cache", "cache"),
+        "export": ("roo.cli.export", "export"),
+        "add": ("roo.cli.add", "add"),
+        "rswitch": ("roo.cli.rswitch", "rswitch"),
+        "run": ("roo.cli.run", "run"),
+        "ci": ("roo.cli.ci", "ci"),
+    })
 @click.option("-q", "--quiet", is_flag=True, help="Suppress any output")
 @click.option("-d", "--debug", is_flag=True, help="Show debug information")
 @click.version_option()
@@ -26,16 +30,3 @@ def main(quiet, debug):
     level = logging.INFO if debug else logging.CRITICAL
     logging.basicConfig(level=level)
     init_console(quiet)
-
-
-main.add_command(init)
-main.add_command(environment)
-main.add_command(package)
-main.add_command(lock)
-main.add_command(install)
-main.add_command(cache)
-main.add_command(export)
-main.add_command(add)
-main.add_command(rswitch)
-main.add_command(run)
-main.add_command(ci)
@@ -1,6 +1,5 @@
-import pathlib
-
 import click
+from roo.cli import RPROJECT_PATH, CATEGORY_CHOICE
 from roo.parsers.rproject import RProject, Dependency
 from roo.semver import VersionRange
 
@@ -11,13 +10,13 @@ from roo.semver import VersionRange
               help=(
                   "Install the deps of the specified category. "
                   "Can be provided multiple times."),
-              type=click.Choice(RProject.ALL_DEPENDENCY_CATEGORIES),
+              type=CATEGORY_CHOICE,
               default="main"
               )
 @click.argument("package", type=click.STRING)
 def add(category: str, package: str):
     try:
-        rproject = RProject.parse(pathlib.Path(".") / "rproject.toml")
+        rproject = RProject.parse_cached(RPROJECT_PATH)
     except IOError:
         raise click.ClickException(
             "Unable to open rproject.toml in current directory"
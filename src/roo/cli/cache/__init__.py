@@ -1,6 +1,12 @@
+import concurrent.futures
+import os
 import pathlib
+import secrets
 import shutil
+from typing import List
+
 from rich.columns import Columns
+from rich.console import Group, RenderableType
 from roo.caches.source_cache import all_source_caches
 from roo.caches.build_cache import all_build_caches
 
@@ -18,11 +24,34 @@ def cache_clear():
     cache_root_dir = pathlib.Path("~/.roo/cache").expanduser()
     console().print("Clearing cache")
     try:
-        shutil.rmtree(cache_root_dir)
+        # Move the cache out of the way first, so that a new empty cache
+        # is available straight away, then delete the old content.
+        deleting_dir = cache_root_dir.with_name(
+            f"{cache_root_dir.name}.{secrets.token_hex(5)}.deleting")
+        try:
+            os.rename(cache_root_dir, deleting_dir)
+        except FileNotFoundError:
+            pass
+
         cache_root_dir.mkdir(parents=True, exist_ok=True)
     except Exception as e:
         raise click.ClickException(f"Unable to clear cache: {e}")
 
+    # Also remove what previous runs failed to delete, e.g. if they
+    # were interrupted. Nothing else would ever remove it.
+    leftovers = []
+    for deleting_dir in cache_root_dir.parent.glob(
+            f"{cache_root_dir.name}.*.deleting"):
+        try:
+            _parallel_rmtree(deleting_dir)
+        except OSError as e:
+            leftovers.append(f"{deleting_dir} ({e})")
+
+    if len(leftovers):
+        raise click.ClickException(
+            "Unable to remove the old cache content. Please delete it "
+            "manually: " + ", ".join(leftovers))
+
 
 @cache.command(
     name="remove",
@@ -35,26 +64,29 @@ def cache_clear():
 @click.argument("package", type=click.STRING)
 def cache_remove(package):
     source_caches = all_source_caches()
-    for c in source_caches:
-        console().print(
-            f"Removing [package]{package}[/package] from source cache of "
-            f"[source]{c.source_url}[/source]"
-        )
-        try:
-            c.remove_package(package)
-        except Exception as e:
-            raise click.ClickException(f"Unable to clear package cache: {e}")
-
     build_caches = all_build_caches()
 
-    for c in build_caches:
-        console().print(
-            f"Removing [package]{package}[/package] from build cache"
-        )
-        try:
-            c.clear_build(package)
-        except Exception as e:
-            raise click.ClickException(f"Unable to clear package cache: {e}")
+    # The messages are printed all at once at the end, or before
+    # reporting an error.
+    messages: List[RenderableType] = []
+    try:
+        for source_cache in source_caches:
+            messages.append(
+                f"Removing [package]{package}[/package] from source cache of "
+                f"[source]{source_cache.source_url}[/source]"
+            )
+            source_cache.remove_package(package)
+
+        for build_cache in build_caches:
+            messages.append(
+                f"Removing [package]{package}[/package] from build cache"
+            )
+            build_cache.clear_build(package)
+    except Exception as e:
+        raise click.ClickException(f"Unable to clear package cache: {e}")
+    finally:
+        if len(messages):
+            console().print(Group(*messages))
 
 
 @cache.command(
@@ -65,31 +97,51 @@ def cache_list():
     source_caches = all_source_caches()
     build_caches = all_build_caches()
 
-    for c in source_caches:
-        console().print(
+    # Collect everything and print it at once, so that rich renders a
+    # single time.
+    renderables: List[RenderableType] = []
+    for source_cache in source_caches:
+        renderables.extend([
             f":earth_africa: Packages cache for source "
-            f"[source]{c.source_url}[/source]")
-
-        console().print(Columns(
-            [
+            f"[source]{source_cache.source_url}[/source]",
+            Columns(
                 f"  :package: [package]{package_name}[/package]"
-                for package_name in c.cached_package_names()
-            ]
-        ))
-        console().print()
+                for package_name in source_cache.cached_package_names()
+            ),
+            "",
+        ])
 
-    build_caches = all_build_caches()
-
-    for c in build_caches:
-        console().print(
+    for build_cache in build_caches:
+        renderables.extend([
             f":hammer: Built packages cache for [environment]"
-            f"R-{c.r_version}-{c.platform}[/environment]:"
-        )
-
-        console().print(Columns(
-            [
+            f"R-{build_cache.r_version}-{build_cache.platform}"
+            f"[/environment]:",
+            Columns(
                 f"  :zap: [package]{name} {version}[/package]"
-                for name, version in c.list_builds()
-            ]
-        ))
-        console().print()
+                for name, version in build_cache.list_builds()
+            ),
+            "",
+        ])
+
+    if len(renderables):
+        console().print(Group(*renderables))
+
+
+def _parallel_rmtree(path: pathlib.Path):
+    """Removes a directory tree, deleting its top level subdirectories
+    concurrently. The deletion is dominated by the filesystem latency
+    of the many unlink calls, which can overlap."""
+    with os.scandir(path) as it:
+        subdirs = [
+            entry.path for entry in it
+            if entry.is_dir(follow_symlinks=False)
+        ]
+
+    if len(subdirs) > 1:
+        with concurrent.futures.ThreadPoolExecutor(
+                max_workers=min(len(subdirs), os.cpu_count() or 1)
+        ) as executor:
+            # list() to propagate the exceptions, if any.
+            list(executor.map(shutil.rmtree, subdirs))
+
+    shutil.rmtree(path)
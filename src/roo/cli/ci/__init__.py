@@ -3,10 +3,9 @@ from typing import Union
 import logging
 
 import click
+from roo.cli import RPROJECT_PATH, LOCK_PATH, install_options
 from roo.console import console
 from roo.environment import enabled_environment, Environment
-from roo.installer import Installer, InstallationError
-from roo.locker import Locker
 from roo.parsers.exceptions import ParsingError
 from roo.parsers.lock import Lock
 from roo.parsers.rproject import RProject
@@ -17,62 +16,7 @@ logger = logging.getLogger(__file__)
 @click.command(
     help="CI friendly version of install. Does not recreate the lock."
 )
-@click.option(
-    "--env-base-dir",
-    help="The environment base directory.",
-    type=click.Path(), default=".")
-@click.option(
-    "--env-name",
-    help="The name of the environment to create",
-    type=click.STRING, default=None)
-@click.option(
-    "--quiet",
-    help="Disables output",
-    is_flag=True, default=False)
-@click.option(
-    "--verbose-build",
-    help=(
-        "Enables verbose building process. "
-        "Useful to debug errors in the build."),
-    is_flag=True, default=False
-)
-@click.option(
-    "--env-overwrite",
-    help="Overwrite the environment if already existent",
-    is_flag=True, default=False)
-@click.option(
-    "--env-r-executable-path",
-    help=(
-        "The path to the R executable to use if a new"
-        " environment needs to be created. Ignored if the"
-        " environment already exists."
-    ),
-    type=click.Path(), default=None)
-@click.option(
-    "--category",
-    help=(
-        "Install the deps of the specified category. "
-        "Can be provided multiple times."),
-    multiple=True,
-    type=click.Choice(RProject.ALL_DEPENDENCY_CATEGORIES),
-)
-@click.option(
-    "--serial",
-    help=(
-        "Perform downloading and installation serially."
-        " Slower but safer."
-    ),
-    is_flag=True,
-    default=False
-)
-@click.option(
-    "--use-vanilla",
-    help=(
-        "If specified, do not run any Renviron or Rprofile files."
-    ),
-    is_flag=True,
-    default=False
-)
+@install_options
 def ci(env_base_dir: Union[str, pathlib.Path],
        env_name: str,
        quiet: bool,
@@ -82,17 +26,16 @@ def ci(env_base_dir: Union[str, pathlib.Path],
        category: list,
        serial: bool,
        use_vanilla: bool):
+    from roo.installer import Installer, InstallationError
 
     try:
-        rproject = RProject.parse(pathlib.Path(".") / "rproject.toml")
+        rproject = RProject.parse_cached(RPROJECT_PATH)
     except IOError:
         raise click.ClickException(
             "Unable to open rproject.toml in current directory"
         )
-    lock_path = pathlib.Path(".") / "roo.lock"
-
     try:
-        lock_file = Lock.parse(lock_path)
+        lock_file = Lock.parse(LOCK_PATH)
     except FileNotFoundError:
         console().print("[error]Lockfile not found.[/error]")
         raise click.ClickException("Lockfile not found")
@@ -102,10 +45,8 @@ def ci(env_base_dir: Union[str, pathlib.Path],
             f"[error]Existing Lockfile could not be parsed: {e}.[/error]")
         raise click.ClickException(f"Unable to parse current lock file: {e}")
 
-    locker = Locker()
-
-    if not locker.is_lock_file_sync(
-            rproject, lock_file, lock_file.metadata.conservative):
+    if not lock_file.is_sync(
+            rproject.content_hash, lock_file.metadata.conservative):
         console().print(
             "[error]Lockfile is not synchronized with rproject. "
             "Cannot run roo ci.[/error]"
@@ -115,25 +56,22 @@ def ci(env_base_dir: Union[str, pathlib.Path],
 
     env_base_dir = pathlib.Path(env_base_dir)
 
-    enabled_env = enabled_environment(env_base_dir)
-    if enabled_env is not None:
-        if env_name is None:
-            # If we already have an environment enabled and no further
-            # specification of parameters, we keep using that env.
-            env = enabled_env
-        else:
-            # However, if the user specified a --env-name, we'll honor that
-            env = Environment(base_dir=env_base_dir, name=env_name)
-    else:
-        # Otherwise, we use the env as specified, using the defaults in case.
-        if env_name is None:
-            env_name = "default"
+    if env_name is not None:
+        # If the user specified a --env-name, we'll honor that, and there's
+        # no need to look for the enabled environment.
         env = Environment(base_dir=env_base_dir, name=env_name)
+    else:
+        # If we already have an environment enabled and no further
+        # specification of parameters, we keep using that env.
+        # Otherwise, we use the default one.
+        env = enabled_environment(env_base_dir)
+        if env is None:
+            env = Environment(base_dir=env_base_dir, name="default")
 
     if env_r_executable_path is not None:
         env_r_executable_path = pathlib.Path(env_r_executable_path)
 
-    if not env.exists() or env_overwrite:
+    if env_overwrite or not env.exists():
         try:
             env.init(r_executable_path=env_r_executable_path,
                      overwrite=env_overwrite
@@ -147,7 +85,7 @@ def ci(env_base_dir: Union[str, pathlib.Path],
     if len(category) == 0:
         categories = RProject.ALL_DEPENDENCY_CATEGORIES
     else:
-        categories = list(set(category))
+        categories = tuple(dict.fromkeys(category))
 
     installer = Installer(
         verbose_build=verbose_build,
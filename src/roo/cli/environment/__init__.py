@@ -1,7 +1,9 @@
 import pathlib
 import logging
 import click
+from roo.cli import BASE_DIR_OPTION
 from roo.console import console
+from roo.files.rprofile import RProfile
 from roo.r_executor import ExecutorError
 
 from roo.environment import Environment, available_environments, \
@@ -20,10 +22,7 @@ def environment():
     help=("Initialises a new environment with a given name, "
           "or the name \"default\" if not specified.")
 )
-@click.option("--base-dir",
-              help=("The base directory for the environments. "
-                    "If not specified, use the current directory."),
-              type=click.Path(), default=".")
+@BASE_DIR_OPTION
 @click.option("--overwrite",
               help="Overwrites the environment if already present.",
               is_flag=True, default=False)
@@ -53,37 +52,37 @@ def environment_init(base_dir, overwrite, r_version, r_executable_path, name):
     name="list",
     help="List all available environments"
 )
-@click.option("--base-dir",
-              help=("The base directory for the environments. "
-                    "If not specified, use the current directory."),
-              type=click.Path(), default=".")
+@BASE_DIR_OPTION
 def environment_list(base_dir):
     base_dir = pathlib.Path(base_dir)
     envs = available_environments(base_dir)
 
+    # Parse the .Rprofile only once, rather than once per environment.
+    enabled_name = RProfile(base_dir / ".Rprofile").enabled_environment
+
+    # Assemble styled Text directly, rather than having rich parse the
+    # markup of every line.
+    from rich.text import Text
+
+    print_ = console().print
     for env in envs:
         try:
-            r_version = env.r_version_info["version"]
+            r_version = Text(env.r_version_info["version"], style="version")
         except ExecutorError:
-            r_version = "[error]broken R[/error]"
+            r_version = Text("broken R", style="error")
 
-        if env.is_enabled():
-            console().print(
-                f"* [environment]{env.name}[/environment] "
-                f"([version]{r_version}[/version])"
-            )
+        if env.name == enabled_name:
+            print_(Text.assemble(
+                "* ", (env.name, "environment"), " (", r_version, ")"))
         else:
-            console().print(f"{env.name} ([version]{r_version}[/version])")
+            print_(Text.assemble(env.name, " (", r_version, ")"))
 
 
 @environment.command(
     name="enable",
     help="Enable a given environment."
 )
-@click.option("--base-dir",
-              help=("The base directory for the environments. "
-                    "If not specified, use the current directory."),
-              type=click.Path(), default=".")
+@BASE_DIR_OPTION
 @click.argument("name", type=click.STRING)
 def environment_enable(base_dir, name):
     base_dir = pathlib.Path(base_dir)
@@ -102,10 +101,7 @@ def environment_enable(base_dir, name):
     name="disable",
     help="Disable the currently enabled environment."
 )
-@click.option("--base-dir",
-              help=("The base directory for the environments. "
-                    "If not specified, use the current directory."),
-              type=click.Path(), default=".")
+@BASE_DIR_OPTION
 def environment_disable(base_dir):
     base_dir = pathlib.Path(base_dir)
 
@@ -124,7 +120,7 @@ def environment_disable(base_dir):
 
 @environment.command(name="remove",
                      help="Removes an environment by name")
-@click.option("--base-dir", type=click.Path(), default=".")
+@BASE_DIR_OPTION
 @click.argument("name", type=click.STRING, default="default")
 def environment_remove(base_dir, name):
     base_dir = pathlib.Path(base_dir)
@@ -145,8 +141,9 @@ def environment_remove(base_dir, name):
                      ))
 def environment_options():
     all_r_homes = find_all_installed_r_homes()
+    print_ = console().print
     for entry in all_r_homes:
-        console().print(
+        print_(
             ("* " if entry["active"] else "  ") +
             f"[version]{entry['version']}[/version] {entry['home_path']}"
         )
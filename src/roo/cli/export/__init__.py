@@ -1,11 +1,21 @@
+import importlib
+
 import click
 from roo.console import console
 from roo.cli.lock import ensure_lock
 from roo.exporters.exceptions import ExportError
 from roo.exporters.lock.base_exporter import BaseExporter
-from roo.exporters.lock.lock_csv_exporter import LockCSVExporter
-from roo.exporters.lock.lock_packrat_exporter import LockPackratExporter
-from roo.exporters.lock.lock_renv_exporter import LockRenvExporter
+
+# Format -> (exporter module, exporter class, default output filename).
+# The exporter modules are imported only when their format is requested.
+_LOCK_EXPORTERS = {
+    "csv": ("roo.exporters.lock.lock_csv_exporter",
+            "LockCSVExporter", "lock.csv"),
+    "packrat": ("roo.exporters.lock.lock_packrat_exporter",
+                "LockPackratExporter", "packrat.lock"),
+    "renv": ("roo.exporters.lock.lock_renv_exporter",
+             "LockRenvExporter", "renv.lock"),
+}
 
 
 @click.group(help="Commands to export data and information to different tools")
@@ -14,23 +24,14 @@ def export():
 
 
 @export.command(name="lock", help="Exports lock to different formats")
-@click.argument("format", type=click.Choice(["csv", "packrat", "renv"]))
+@click.argument("format", type=click.Choice(list(_LOCK_EXPORTERS)))
 @click.argument("output", type=click.Path(writable=True), required=False)
 def export_lock(format, output):
     lock_file = ensure_lock(False, False, False)
 
-    exporter: BaseExporter
-    if format == "csv":
-        exporter = LockCSVExporter()
-        default_filename = "lock.csv"
-    elif format == "packrat":
-        exporter = LockPackratExporter()
-        default_filename = "packrat.lock"
-    elif format == "renv":
-        exporter = LockRenvExporter()
-        default_filename = "renv.lock"
-    else:
-        raise RuntimeError(f"Programming error. Not matched format {format}")
+    module_name, class_name, default_filename = _LOCK_EXPORTERS[format]
+    exporter: BaseExporter = getattr(
+        importlib.import_module(module_name), class_name)()
 
     if output is None:
         output = default_filename
@@ -1,6 +1,7 @@
-import pathlib
+import os
 
 import click
+from roo.cli import RPROJECT_PATH
 from roo.parsers.rproject import RProject, Source
 
 
@@ -9,16 +10,24 @@ from roo.parsers.rproject import RProject, Source
     help="Create a basic rproject.toml"
 )
 def init():
-    path = pathlib.Path("rproject.toml")
-    if path.exists():
+    # Create the file exclusively, so that two concurrent inits can't both
+    # succeed. save() then replaces it.
+    try:
+        os.close(os.open(RPROJECT_PATH,
+                         os.O_WRONLY | os.O_CREAT | os.O_EXCL, 0o644))
+    except FileExistsError:
         raise click.ClickException("File rproject.toml already present.")
 
     rproject = RProject()
-    rproject.path = "rproject.toml"
+    rproject.path = RPROJECT_PATH
     rproject.metadata.name = "myproject"
     rproject.metadata.version = "0.1.0"
     rproject.sources.append(
         Source(name="CRAN", url="https://cloud.r-project.org/")
     )
 
-    rproject.save()
+    try:
+        rproject.save()
+    except Exception:
+        RPROJECT_PATH.unlink(missing_ok=True)
+        raise
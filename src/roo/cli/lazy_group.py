@@ -0,0 +1,47 @@
+import importlib
+from typing import Dict, List, Optional, Tuple
+
+import click
+
+
+class LazyGroup(click.Group):
+    """
+    A click group whose subcommands are imported only when they are
+    actually invoked, so that running one command does not pay for
+    importing all the others and their dependencies.
+    """
+
+    def __init__(self,
+                 *args,
+                 lazy_subcommands: Optional[Dict[str, Tuple[str, str]]] = None,
+                 **kwargs):
+        """
+        Args:
+            lazy_subcommands: maps each command name to the module path
+                              and the attribute name of the command,
+                              e.g. {"init": ("roo.cli.init", "init")}
+        """
+        super().__init__(*args, **kwargs)
+        self.lazy_subcommands = lazy_subcommands or {}
+
+    def list_commands(self, ctx: click.Context) -> List[str]:
+        return sorted(set(super().list_commands(ctx)) |
+                      set(self.lazy_subcommands))
+
+    def get_command(self,
+                    ctx: click.Context,
+                    cmd_name: str) -> Optional[click.Command]:
+        cmd = super().get_command(ctx, cmd_name)
+        if cmd is not None or cmd_name not in self.lazy_subcommands:
+            return cmd
+
+        module_name, attr_name = self.lazy_subcommands[cmd_name]
+        cmd = getattr(importlib.import_module(module_name), attr_name)
+        if not isinstance(cmd, click.Command):
+            raise ValueError(
+                f"Lazy loading of {module_name}.{attr_name} "
+                f"did not return a click command")
+
+        # Keep it, so that we don't go through the import again.
+        self.add_command(cmd, cmd_name)
+        return cmd
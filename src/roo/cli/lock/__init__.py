@@ -1,14 +1,11 @@
 import logging
-import os
-import pathlib
 
 import click
+from roo.cli import RPROJECT_PATH, LOCK_PATH
 from roo.console import console
-from roo.locker import Locker
 from roo.parsers.exceptions import ParsingError
 from roo.parsers.lock import Lock
 from roo.parsers.rproject import RProject
-from roo.resolver import CannotResolveError
 
 
 logger = logging.getLogger(__file__)
@@ -47,29 +44,26 @@ def ensure_lock(
     False. This is to prevent re-locking during install.
     """
     try:
-        rproject = RProject.parse(pathlib.Path(".") / "rproject.toml")
+        rproject = RProject.parse_cached(RPROJECT_PATH)
     except IOError:
         raise click.ClickException(
             "Unable to open rproject.toml in current directory"
         )
-    lock_path = pathlib.Path(".") / "roo.lock"
-
+    old_lock = None
     if overwrite:
+        # No point in parsing a lock file that is going to be removed.
+        LOCK_PATH.unlink(missing_ok=True)
+    else:
         try:
-            os.remove(lock_path)
+            old_lock = Lock.parse(LOCK_PATH)
         except FileNotFoundError:
-            pass
-
-    old_lock = None
-    try:
-        old_lock = Lock.parse(lock_path)
-    except FileNotFoundError:
-        console().print("[warning]Lockfile not found.[/warning]")
-    except ParsingError as e:
-        logger.exception("Unable to parse current lockfile")
-        console().print(
-            f"[error]Existing Lockfile could not be parsed: {e}.[/error]")
-        raise click.ClickException(f"Unable to parse current lock file: {e}")
+            console().print("[warning]Lockfile not found.[/warning]")
+        except ParsingError as e:
+            logger.exception("Unable to parse current lockfile")
+            console().print(
+                f"[error]Existing Lockfile could not be parsed: {e}.[/error]")
+            raise click.ClickException(
+                f"Unable to parse current lock file: {e}")
 
     if old_lock is None:
         old_lock = Lock()
@@ -77,6 +71,17 @@ def ensure_lock(
     if not conservative:
         conservative = old_lock.metadata.conservative
 
+    if (not fix_changed_hash and
+            old_lock.is_sync(rproject.content_hash, conservative)):
+        # Nothing to resolve, and no need to rewrite the lock file.
+        console().print("rproject and lock file are already synchronized.")
+        return old_lock
+
+    # Imported here, as the locker and resolver pull in the network and
+    # vcs libraries, which are not needed if the lock is already in sync.
+    from roo.locker import Locker
+    from roo.resolver import CannotResolveError
+
     locker = Locker()
     try:
         if fix_changed_hash:
@@ -88,5 +93,5 @@ def ensure_lock(
     except CannotResolveError as e:
         raise click.ClickException(f"Unable to create lock file: {e}")
 
-    new_lock.save(old_lock.path)
+    new_lock.save(LOCK_PATH)
     return new_lock
@@ -1,9 +1,9 @@
-import pathlib
+import concurrent.futures
 
 import click
+from roo.cli import RPROJECT_PATH
 from roo.console import console
 from roo.parsers.rproject import RProject
-from roo.sources.source_group import create_source_group_from_config_list
 
 
 @click.group(help="Subgroup for package management commands")
@@ -16,27 +16,43 @@ def package():
                       " by the current rproject.toml")
 @click.argument("name", type=click.STRING)
 def package_search(name):
+    from roo.sources.source_group import (
+        create_source_group_from_config_list)
+
     try:
-        rproject = RProject.parse(pathlib.Path(".") / "rproject.toml")
+        rproject = RProject.parse_cached(RPROJECT_PATH)
     except IOError:
         raise click.ClickException(
             "Unable to open rproject.toml in current directory"
         )
 
     source_group = create_source_group_from_config_list(rproject.sources)
-    for source in source_group.all_sources:
-        console().print(
-            f":earth_africa: [source]{source.name}[/source] "
-            f"({source.location})")
-        with console().status("Searching ... "):
-            for package in source.find_package_versions(name):
+    sources = source_group.all_sources
+    if len(sources) == 0:
+        return
+
+    # Query all the sources at once, as each query is mostly spent waiting
+    # on the network, but print the results in the sources order.
+    with concurrent.futures.ThreadPoolExecutor(
+            max_workers=len(sources)) as executor:
+        futures = [
+            executor.submit(source.find_package_versions, name)
+            for source in sources
+        ]
+        for source, future in zip(sources, futures):
+            console().print(
+                f":earth_africa: [source]{source.name}[/source] "
+                f"({source.location})")
+            with console().status("Searching ... "):
+                packages = future.result()
+            for package in packages:
                 icon = ":glowing_star:" if package.active else ":package:"
                 console().print(
                     f"  {icon} [package]{package.name}[/package]"
                     f" [version]{package.version}" +
 
                     (" ([active]Active[/active]) " if package.active else ""))
-        console().print("")
+            console().print("")
 
 
 @package.command(name="dependencies",
@@ -45,8 +61,11 @@ def package_search(name):
 @click.argument("name", type=click.STRING)
 @click.argument("version", type=click.STRING)
 def package_dependencies(name, version):
+    from roo.sources.source_group import (
+        create_source_group_from_config_list)
+
     try:
-        rproject = RProject.parse(pathlib.Path(".") / "rproject.toml")
+        rproject = RProject.parse_cached(RPROJECT_PATH)
     except IOError:
         raise click.ClickException(
             "Unable to open rproject.toml in current directory"
@@ -1,9 +1,11 @@
 import click
 from click.exceptions import Exit
+import os
 import platform
 
 from roo.console import console
-from roo.environment import find_all_installed_r_homes
+from roo.environment import find_all_installed_r_homes, \
+    find_r_home_for_version
 
 
 @click.command(
@@ -20,17 +22,14 @@ def rswitch(version):
         )
         raise Exit(0)
 
-    all_r_homes = find_all_installed_r_homes()
-
     if version is None:
-        _print_available(all_r_homes)
+        _print_available(find_all_installed_r_homes())
         raise Exit(0)
 
-    try:
-        found_version = [x for x in all_r_homes if x["version"] == version][0]
-    except IndexError:
+    found_version = find_r_home_for_version(version)
+    if found_version is None:
         console().print(f"[error]Version {version} not found.[/error]")
-        _print_available(all_r_homes)
+        _print_available(find_all_installed_r_homes())
         raise Exit(1)
 
     if found_version["active"]:
@@ -40,7 +39,7 @@ def rswitch(version):
         return
 
     current_link = found_version["home_path"] / ".." / "Current"
-    if not current_link.is_symlink():
+    if not os.path.islink(current_link):
         console().print(
             f"[error]Entry {current_link} is supposed to be a link, but it "
             "is not. Check your R installation.[/error]"
@@ -82,9 +81,10 @@ def _on_macos() -> bool:
 
 
 def _print_available(all_r_homes):
-    console().print("Available versions:")
+    print_ = console().print
+    print_("Available versions:")
     for entry in all_r_homes:
-        console().print(
+        print_(
             ("* " if entry["active"] else "  ") +
             f"[version]{entry['version']}[/version] {entry['home_path']}"
         )
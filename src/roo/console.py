@@ -1,13 +1,33 @@
-from rich.console import Console
-from rich.theme import Theme
+import functools
+from typing import Any, Optional
 
-_console = None
+
+class _LazyConsole:
+    """
+    Stands in for the rich Console, which is only created (and rich
+    imported) the first time one of its attributes is actually used.
+    """
+
+    def __init__(self, quiet: bool):
+        self._quiet = quiet
+        self._real: Any = None
+
+    def __getattr__(self, name: str) -> Any:
+        # Only called for attributes not found on the proxy itself.
+        if self.__dict__.get("_real") is None:
+            from rich.console import Console
+            self._real = Console(theme=_create_theme(), quiet=self._quiet)
+
+        return getattr(self._real, name)
+
+
+_console: Optional[_LazyConsole] = None
 
 
 def init_console(quiet: bool):
     global _console
     if _console is None:
-        _console = Console(theme=_create_theme(), quiet=quiet)
+        _console = _LazyConsole(quiet)
 
 
 def console():
@@ -17,7 +37,9 @@ def console():
     return _console
 
 
+@functools.lru_cache(maxsize=1)
 def _create_theme():
+    from rich.theme import Theme
     return Theme({
         "success": "green",
         "message": "bold blue",
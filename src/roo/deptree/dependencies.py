@@ -4,10 +4,14 @@ it is composed of resolved and unresolved dependencies until
 everything is fully traversed and resolved.
 
 This tree is generally serialised as a lock file.
+
+The trees can hold thousands of nodes, so the classes declare __slots__.
+The slots are spelled out, as dataclass(slots=True) needs python 3.10.
 """
 from __future__ import annotations
 import dataclasses
-from typing import List, Union, Optional
+import sys
+from typing import FrozenSet, Iterable, List, Set, Union, Optional, Tuple
 
 from ..semver import VersionConstraint
 from ..sources.source_package import SourcePackage
@@ -17,37 +21,60 @@ from ..sources.source_package import SourcePackage
 class RootDependency:
     """Represents the top of the tree of dependencies.
     It has no name or category."""
-    # its subdependencies, which can only be structural
-    dependencies: List[StructuralDependency]
+    __slots__ = ("dependencies",)
+
+    # its subdependencies, which can only be structural. A tuple, as it is
+    # only replaced as a whole, never modified.
+    dependencies: Tuple[StructuralDependency, ...]
 
 
 @dataclasses.dataclass
 class ResolvedDependency:
     """Base class for all resolved dependencies"""
+    __slots__ = ("name", "categories", "dependencies")
+
     # The dependency name
     name: str
     # the categories it belongs to.
-    categories: List[str]
-    # its subdependencies, which can only be structural
-    dependencies: List[StructuralDependency]
+    categories: FrozenSet[str]
+    # its subdependencies, which can only be structural. A tuple, as it is
+    # only replaced as a whole, never modified.
+    dependencies: Tuple[StructuralDependency, ...]
 
-    def add_categories_recursive(self, categories: List[str]):
-        """Adds a category to the dependency, and also traverse
-        the tree to add the same category to all its subdependencies"""
-        self.categories = list(set(self.categories + categories))
+    def __post_init__(self):
+        self.categories = category_set(self.categories)
 
-        for subdep in self.dependencies:
-            if isinstance(subdep, ResolvedDependency):
-                subdep.add_categories_recursive(categories)
-            elif isinstance(subdep, UnresolvedDependency):
-                subdep.categories = list(set(subdep.categories + categories))
-            else:
-                raise TypeError(f"Unexpected type for {subdep}")
+    def add_categories_recursive(self, categories: Iterable[str]):
+        """Adds a category to the dependency, and also traverse
+        the tree to add the same category to all its subdependencies."""
+        categories = category_set(categories)
+
+        # Iterative, as the trees can be deeper than the recursion limit.
+        # A node having the categories already says nothing about its
+        # subdependencies, so the whole subtree is visited, but each
+        # node only once, even when shared by several parents.
+        visited: Set[int] = set()
+        stack: List[StructuralDependency] = [self]
+        while stack:
+            node = stack.pop()
+            if id(node) in visited:
+                continue
+            visited.add(id(node))
+
+            if not categories <= node.categories:
+                node.categories = node.categories | categories
+
+            if isinstance(node, ResolvedDependency):
+                stack.extend(node.dependencies)
+            elif not isinstance(node, UnresolvedDependency):
+                raise TypeError(f"Unexpected type for {node}")
 
 
 @dataclasses.dataclass
 class ResolvedSourceDependency(ResolvedDependency):
     """Represents a dependency that is resolved by a source such as CRAN"""
+    __slots__ = ("package", "r_constraint")
+
     # The package that this dependency uses for resolution
     package: SourcePackage
 
@@ -58,6 +85,8 @@ class ResolvedSourceDependency(ResolvedDependency):
 @dataclasses.dataclass
 class ResolvedVCSDependency(ResolvedDependency):
     """Represents a dependency that is resolved by a Version control system"""
+    __slots__ = ("vcs_type", "url", "ref")
+
     # The VCS type (for now only git)
     vcs_type: str
     # The url of the VCS endpoint
@@ -70,6 +99,13 @@ class ResolvedVCSDependency(ResolvedDependency):
 @dataclasses.dataclass
 class ResolvedCoreDependency(ResolvedDependency):
     """Represents a core dependency that is resolved by R itself"""
+    __slots__ = ()
+
+    # Core packages have no subdependencies. A factory rather than a plain
+    # default, as a class attribute would shadow the inherited slot.
+    # tuple() always returns the same empty tuple, so nothing is allocated.
+    dependencies: Tuple[StructuralDependency, ...] = dataclasses.field(
+        default_factory=tuple)
 
 
 @dataclasses.dataclass
@@ -77,25 +113,42 @@ class UnresolvedDependency:
     """
     Represents a dependency that is currently still unresolved.
     """
+    __slots__ = ("name", "categories")
+
     name: str
-    categories: List[str]
+    categories: FrozenSet[str]
+
+    def __post_init__(self):
+        self.categories = category_set(self.categories)
 
 
 @dataclasses.dataclass
 class UnresolvedConstrainedDependency(UnresolvedDependency):
     """represents an unresolved dependency that is described by a name
     and a constraint"""
+    __slots__ = ("constraint",)
+
     constraint: VersionConstraint
 
 
 @dataclasses.dataclass
 class UnresolvedVCSDependency(UnresolvedDependency):
     """Represents an unresolved dependency pointing at a VCS resource"""
+    __slots__ = ("vcs_type", "url", "ref")
+
     vcs_type: str
     url: str
     ref: Optional[str]
 
 
+def category_set(categories: Iterable[str]) -> FrozenSet[str]:
+    """Returns the categories as a frozenset of interned strings, as
+    there are only a few distinct categories shared by many dependencies."""
+    if isinstance(categories, frozenset):
+        return categories
+    return frozenset(sys.intern(c) for c in categories)
+
+
 # StructuralDependency is a type for any dependency, resolved or unresolved,
 # that is not the root dependency
 StructuralDependency = Union[ResolvedDependency, UnresolvedDependency]
@@ -1,16 +1,18 @@
-from typing import List, Dict, cast
+import functools
+from typing import Any, Callable, List, Dict, Tuple, Union
 
-from roo.semver import parse_constraint
+from roo.semver import parse_constraint, VersionConstraint
 
 from ..parsers.lock import LockEntry, RootLockEntry, SourceLockEntry, \
     VCSLockEntry, CoreLockEntry, PackageFile
 from .dependencies import RootDependency, ResolvedDependency, \
     ResolvedSourceDependency, ResolvedVCSDependency, ResolvedCoreDependency, \
-    UnresolvedDependency, UnresolvedConstrainedDependency, \
-    UnresolvedVCSDependency, StructuralDependency
+    UnresolvedConstrainedDependency, \
+    UnresolvedVCSDependency, StructuralDependency, AnyDependency, \
+    category_set
 from ..parsers.rproject import Dependency as RProjectDependency
 from ..sources.source_group import SourceGroup
-from .traverse import traverse_depth_first_unique
+from .traverse import iter_depth_first_unique
 
 
 def lock_entries_to_deptree(
@@ -19,143 +21,173 @@ def lock_entries_to_deptree(
     """Convert the entries from the lock file back into the
     fully resolved dependency tree."""
 
-    root = RootDependency(dependencies=[])
+    root = RootDependency(dependencies=())
 
     if len(entries) == 0:
         return root
 
     # Reconstruct the flattened tree, but leave the dependencies of each entry
-    # unresolved for now. We'll bind them afterwards. To do so, keep track of
-    # them with this index
+    # out for now. We'll bind them afterwards, once all the entries have been
+    # created. To do so, keep track of the dependency names of each entry.
     all_deps: Dict[str, ResolvedDependency] = {}
+    dependency_names: List[Tuple[ResolvedDependency, List[str]]] = []
+    root_dependency_names: List[str] = []
 
     for entry in entries:
-        if isinstance(entry, RootLockEntry):
-            root.dependencies = [
-                UnresolvedDependency(name=d, categories=[])
-                for d in entry.dependencies
-            ]
-        elif isinstance(entry, SourceLockEntry):
-            source = source_group.source_by_name(entry.source)
-            source_package = source.find_package(entry.name, entry.version)
-            source_package.expected_hash = entry.files[0].hash
-            all_deps[entry.name] = ResolvedSourceDependency(
-                name=entry.name,
-                categories=entry.categories,
-                package=source_package,
-                r_constraint=parse_constraint(entry.r_constraint),
-                dependencies=[
-                    UnresolvedDependency(
-                        name=d,
-                        categories=entry.categories,
-                    )
-                    for d in entry.dependencies
-                ]
-            )
-        elif isinstance(entry, VCSLockEntry):
-            all_deps[entry.name] = ResolvedVCSDependency(
-                name=entry.name,
-                vcs_type=entry.vcs_type,
-                url=entry.url,
-                ref=entry.ref,
-                categories=entry.categories,
-                dependencies=[
-                    UnresolvedDependency(
-                        name=d,
-                        categories=entry.categories,
-                    )
-                    for d in entry.dependencies
-                ]
-            )
-        elif isinstance(entry, CoreLockEntry):
-            all_deps[entry.name] = ResolvedCoreDependency(
-                name=entry.name,
-                categories=entry.categories,
-                dependencies=[]
-            )
-        else:
+        if type(entry) is RootLockEntry:
+            root_dependency_names = entry.dependencies
+            continue
+
+        from_lock_entry = _FROM_LOCK_ENTRY.get(type(entry))
+        if from_lock_entry is None:
             raise TypeError(f"Unrecognised entry {entry}")
 
-    # now, resolve all the dependencies
-    for dep in all_deps.values():
-        dep.dependencies = [
-            all_deps[unresolved.name] for unresolved in dep.dependencies
-        ]
+        dep = from_lock_entry(source_group, entry)
+        all_deps[dep.name] = dep
+        dependency_names.append((dep, entry.dependencies))
 
-    # Then, resolve the root ones.
-    root.dependencies = [
-        all_deps[unresolved.name] for unresolved in root.dependencies
-    ]
+    # now, resolve all the dependencies, and then the root ones.
+    get_dep = all_deps.__getitem__
+    for dep, names in dependency_names:
+        dep.dependencies = tuple(get_dep(name) for name in names)
+
+    root.dependencies = tuple(
+        get_dep(name) for name in root_dependency_names)
 
     # and finally, return the root
     return root
 
 
+def _source_from_lock_entry(source_group: SourceGroup,
+                            entry: SourceLockEntry) -> ResolvedDependency:
+    source = source_group.source_by_name(entry.source)
+    source_package = source.find_package(entry.name, entry.version)
+    source_package.expected_hash = entry.files[0].hash
+    return ResolvedSourceDependency(
+        name=entry.name,
+        categories=category_set(entry.categories),
+        package=source_package,
+        r_constraint=_parse_r_constraint(entry.r_constraint),
+        dependencies=()
+    )
+
+
+@functools.lru_cache(maxsize=256)
+def _parse_r_constraint(constraint: str) -> VersionConstraint:
+    """Parses the R constraint of a lock entry. Most packages share the
+    same few constraints, so they are only parsed once. The constraint
+    objects are immutable, hence safe to share."""
+    return parse_constraint(constraint)
+
+
+def _vcs_from_lock_entry(source_group: SourceGroup,
+                         entry: VCSLockEntry) -> ResolvedDependency:
+    return ResolvedVCSDependency(
+        name=entry.name,
+        vcs_type=entry.vcs_type,
+        url=entry.url,
+        ref=entry.ref,
+        categories=category_set(entry.categories),
+        dependencies=()
+    )
+
+
+def _core_from_lock_entry(source_group: SourceGroup,
+                          entry: CoreLockEntry) -> ResolvedDependency:
+    return ResolvedCoreDependency(
+        name=entry.name,
+        categories=category_set(entry.categories)
+    )
+
+
+_FROM_LOCK_ENTRY: Dict[type, Callable[[SourceGroup, Any],
+                                      ResolvedDependency]] = {
+    SourceLockEntry: _source_from_lock_entry,
+    VCSLockEntry: _vcs_from_lock_entry,
+    CoreLockEntry: _core_from_lock_entry,
+}
+
+
 def deptree_to_lock_entries(root: RootDependency) -> List[LockEntry]:
     """
     Converts the dependency tree into the linearized list of entries
     for addition to the lock file.
     """
     # It is required that the whole tree is resolved fully.
-    # We assume so because we run this algorithm on the fully resolved tree,
-    # hence we cast all subdependencies to a resolved dependency.
-
-    lock_entries: List[LockEntry] = []
-    for dependency in traverse_depth_first_unique(root):
-        if isinstance(dependency, ResolvedCoreDependency):
-            lock_entries.append(
-                CoreLockEntry(
-                    name=dependency.name,
-                    categories=dependency.categories,
-                    dependencies=[]
-                )
-            )
-            continue
+    # We assume so because we run this algorithm on the fully resolved tree.
+    # The traversal raises TypeError on any unresolved dependency.
+    return [
+        _to_lock_entry(dependency)
+        for dependency in iter_depth_first_unique(root)
+    ]
 
-        dependencies = [
-            cast(ResolvedDependency, x).name
-            for x in cast(ResolvedDependency, dependency).dependencies]
 
-        if isinstance(dependency, RootDependency):
-            lock_entries.append(
-                RootLockEntry(
-                    categories=[],
-                    dependencies=dependencies
-                )
-            )
-        elif isinstance(dependency, ResolvedSourceDependency):
-            lock_entries.append(
-                SourceLockEntry(
-                    name=dependency.package.name,
-                    version=dependency.package.version,
-                    source=dependency.package.source.name,
-                    categories=dependency.categories,
-                    r_constraint=str(dependency.r_constraint),
-                    files=[
-                        PackageFile(
-                            name=dependency.package.filename,
-                            hash=dependency.package.hash,
-                            md5=dependency.package.md5
-                        )
-                    ],
-                    dependencies=dependencies
-                ))
-        elif isinstance(dependency, ResolvedVCSDependency):
-            lock_entries.append(
-                VCSLockEntry(
-                    name=dependency.name,
-                    vcs_type=dependency.vcs_type,
-                    url=dependency.url,
-                    ref=dependency.ref,
-                    dependencies=dependencies,
-                    categories=dependency.categories
-                )
+def _to_lock_entry(dependency: AnyDependency) -> LockEntry:
+    to_lock_entry = _TO_LOCK_ENTRY.get(type(dependency))
+    if to_lock_entry is None:
+        raise TypeError(
+            f"No clue what to write in the package for {dependency}")
+    return to_lock_entry(dependency)
+
+
+def _dependency_names(
+        dependency: Union[RootDependency, ResolvedDependency]) -> List[str]:
+    # Resolved and unresolved dependencies both have a name, no cast needed.
+    return [x.name for x in dependency.dependencies]
+
+
+def _root_to_lock_entry(dependency: RootDependency) -> LockEntry:
+    return RootLockEntry(
+        categories=[],
+        dependencies=_dependency_names(dependency)
+    )
+
+
+def _core_to_lock_entry(dependency: ResolvedCoreDependency) -> LockEntry:
+    return CoreLockEntry(
+        name=dependency.name,
+        categories=sorted(dependency.categories),
+        dependencies=[]
+    )
+
+
+def _source_to_lock_entry(dependency: ResolvedSourceDependency) -> LockEntry:
+    return SourceLockEntry(
+        name=dependency.package.name,
+        version=dependency.package.version,
+        source=dependency.package.source.name,
+        categories=sorted(dependency.categories),
+        r_constraint=str(dependency.r_constraint),
+        files=[
+            PackageFile(
+                name=dependency.package.filename,
+                hash=dependency.package.hash,
+                md5=dependency.package.md5
             )
-        else:
-            raise TypeError(
-                f"No clue what to write in the package for {dependency}")
+        ],
+        dependencies=_dependency_names(dependency)
+    )
+
+
+def _vcs_to_lock_entry(dependency: ResolvedVCSDependency) -> LockEntry:
+    return VCSLockEntry(
+        name=dependency.name,
+        vcs_type=dependency.vcs_type,
+        url=dependency.url,
+        ref=dependency.ref,
+        dependencies=_dependency_names(dependency),
+        categories=sorted(dependency.categories)
+    )
+
 
-    return lock_entries
+# Dispatches on the exact type of the dependency, which is a single
+# lookup instead of a chain of isinstance checks.
+_TO_LOCK_ENTRY: Dict[type, Callable[[Any], LockEntry]] = {
+    RootDependency: _root_to_lock_entry,
+    ResolvedCoreDependency: _core_to_lock_entry,
+    ResolvedSourceDependency: _source_to_lock_entry,
+    ResolvedVCSDependency: _vcs_to_lock_entry,
+}
 
 
 def rproject_to_deptree(rproject_deps: List[RProjectDependency]
@@ -170,14 +202,14 @@ def rproject_to_deptree(rproject_deps: List[RProjectDependency]
                 UnresolvedConstrainedDependency(
                     name=rp_dep.name,
                     constraint=rp_dep.constraint,
-                    categories=[rp_dep.category],
+                    categories=category_set([rp_dep.category]),
                 )
             )
         elif rp_dep.vcs_spec is not None:
             dependencies.append(
                 UnresolvedVCSDependency(
                     name=rp_dep.name,
-                    categories=[rp_dep.category],
+                    categories=category_set([rp_dep.category]),
                     vcs_type="git",
                     url=rp_dep.vcs_spec.git,
                     ref=rp_dep.vcs_spec.branch
@@ -188,4 +220,4 @@ def rproject_to_deptree(rproject_deps: List[RProjectDependency]
                 f"Unknown rproject specification for dependency {rp_dep.name}"
             )
 
-    return RootDependency(dependencies=dependencies)
+    return RootDependency(dependencies=tuple(dependencies))
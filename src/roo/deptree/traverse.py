@@ -1,10 +1,24 @@
 import collections
-from typing import List, cast, Iterable, Any
+from typing import List, Iterator, Set, Deque
 
 from .dependencies import (
     RootDependency, ResolvedDependency, AnyDependency, UnresolvedDependency)
 
 
+def traverse_breadth_first(base: AnyDependency) -> Iterator[AnyDependency]:
+    """
+    Performs a breadth first traversal of the dependency tree, yielding
+    the nodes one at a time. Use this instead of the layered version
+    when only the order of the nodes is needed.
+    """
+    queue: Deque[AnyDependency] = collections.deque([base])
+    while queue:
+        node = queue.popleft()
+        yield node
+        if not isinstance(node, UnresolvedDependency):
+            queue.extend(node.dependencies)
+
+
 def traverse_breadth_first_layered(
         base: AnyDependency) -> List[List[AnyDependency]]:
     """
@@ -13,35 +27,29 @@ def traverse_breadth_first_layered(
     hence the return being a list of lists, ordered from top to bottom.
 
     """
-    layers: List[List[AnyDependency]] = [[base]]
-    while True:
-        layer = layers[-1]
+    layers: List[List[AnyDependency]] = []
+    layer: List[AnyDependency] = [base]
+    while layer:
+        layers.append(layer)
         sublayer: List[AnyDependency] = []
         for node in layer:
             if not isinstance(node, UnresolvedDependency):
-                sublayer.extend(node.dependencies)
-        if len(sublayer) == 0:
-            break
-        layers.append(sublayer)
+                sublayer += node.dependencies
+        layer = sublayer
 
     return layers
 
 
 def traverse_depth_first(base: AnyDependency) -> List[AnyDependency]:
     """Performs a depth first traversal of the dependency tree.
+    Note: for compatibility, the nodes are returned in the order this
+    function always used, which is the breadth first order.
     """
-    def _traverse_tree_2(base: AnyDependency) -> List[AnyDependency]:
-        queue: List[AnyDependency] = []
-        current_idx = 0
-        queue.append(base)
-        while len(queue) != current_idx:
-            node = queue[current_idx]
-            if not isinstance(node, UnresolvedDependency):
-                queue.extend(cast(Iterable, node.dependencies))
-            current_idx += 1
-        return queue
-
-    deps = _traverse_tree_2(base)
+    deps: List[AnyDependency] = [base]
+    # The iteration also visits the nodes appended while it runs.
+    for node in deps:
+        if not isinstance(node, UnresolvedDependency):
+            deps.extend(node.dependencies)
 
     return deps
 
@@ -51,20 +59,28 @@ def traverse_depth_first_unique(
     """Performs a depth first traversal of the dependency tree,
     but ensure that a dependency is added only the first time, and not
     more.
+    Dependencies are deduplicated by name during the traversal, so that
+    subtrees shared by several dependencies are only visited once.
     """
-    return _unique(traverse_depth_first(base))
+    return list(iter_depth_first_unique(base))
 
 
-def _unique(resolved_deps: List[AnyDependency]) -> List[AnyDependency]:
-    od: Any = collections.OrderedDict()
-    for dep in resolved_deps:
-        if isinstance(dep, RootDependency):
-            od[""] = dep
-        elif isinstance(dep, ResolvedDependency):
-            if dep.name in od:
-                continue
-            od[dep.name] = dep
+def iter_depth_first_unique(base: AnyDependency) -> Iterator[AnyDependency]:
+    """Same as traverse_depth_first_unique, but yields the nodes one at a
+    time instead of collecting them in a list."""
+    seen: Set[str] = set()
+    queue: Deque[AnyDependency] = collections.deque([base])
+    while queue:
+        node = queue.popleft()
+        if type(node) is RootDependency:
+            key = ""
+        elif isinstance(node, ResolvedDependency):
+            key = node.name
         else:
-            raise TypeError(f"Unable to handle {dep}")
+            raise TypeError(f"Unable to handle {node}")
 
-    return list(od.values())
+        if key in seen:
+            continue
+        seen.add(key)
+        yield node
+        queue.extend(node.dependencies)
@@ -1,8 +1,9 @@
+import functools
 import re
-from xml.etree import ElementTree
 import textwrap
 from typing import Union, List, Dict, cast, Optional
 import logging
+import os
 import pathlib
 import shutil
 import subprocess
@@ -12,6 +13,7 @@ from .files.rprofile import RProfile
 
 from .parsers.description import Description
 from .parsers.exceptions import ParsingError
+from .parsing_utils import decode_text, loads_toml
 
 from .r_executor import RBoundExecutor, RUnboundExecutor
 
@@ -26,6 +28,56 @@ class ExistentEnvironment(Exception):
     pass
 
 
+# The init.R file of each environment. It is a format() template, hence
+# the doubled braces of the R code.
+_INITR_TEMPLATE = textwrap.dedent("""
+            .parse_config_file <- function() {{
+                out <- list()
+                renv <- readLines('{renv_path}')
+                for (line_num in seq_along(renv)) {{
+                    line <- renv[[line_num]]
+                    m <- regmatches(
+                        line,
+                        regexec("(.+?)\\\\s*=\\\\s*(\\")(.+)(\\")",
+                        line, perl=TRUE)
+                    )
+
+                    key <- m[[1]][[2]]
+                    val <- m[[1]][[4]]
+                    out[[key]] <- val
+                }}
+
+                return(out)
+            }}
+            """) + textwrap.dedent("""
+            config <- .parse_config_file()
+            current_r_version <- paste0(R.version$major, ".", R.version$minor)
+
+            if (config$r_platform != R.version$platform ||
+                config$r_version != current_r_version) {{
+                stop(
+                    paste0(
+                        "Cannot use environment '{name}': ",
+                        "currently running R ",
+                        current_r_version, " ", R.version$platform,
+                        ", but environment is built for R ",
+                        config$r_version, " ", config$r_platform
+                    )
+                )
+            }}
+
+            message(
+                paste0(
+                    'Using environment {name} ',
+                    '(R version: ', config$r_version, ', ',
+                    'platform: ', config$r_platform, ')'
+                )
+            )
+            .libPaths(c('{lib_reldir}'))
+
+            """)
+
+
 class Environment:
     """Describes an environment at a given directory.
     """
@@ -57,10 +109,12 @@ class Environment:
 
         self.name = name
 
+        # The parsed renv.toml, read on first use.
+        self._renv_toml: Optional[Dict] = None
+
     @property
     def r_version_info(self) -> Dict[str, str]:
-        with open(self.env_dir / "renv.toml", "r", encoding="utf-8") as f:
-            data = toml.load(f)
+        data = self._read_renv_toml()
 
         return {
             "version": data["r_version"],
@@ -93,7 +147,7 @@ class Environment:
 
     def exists(self):
         """Returns true if the environment exists at that location"""
-        return (self.env_dir / "init.R").exists()
+        return os.path.exists(os.path.join(self.env_dir, "init.R"))
 
     def enable(self, enabled: bool) -> None:
         """
@@ -105,9 +159,7 @@ class Environment:
         if not self.exists():
             raise UnexistentEnvironment()
 
-        rprofile_path = pathlib.Path(self.base_dir) / ".Rprofile"
-        name = self.name if enabled else None
-        RProfile(rprofile_path).enabled_environment = name
+        self._set_enabled(enabled)
 
     def is_enabled(self) -> bool:
         """
@@ -123,9 +175,7 @@ class Environment:
         if not self.exists():
             raise IOError("The environment does not exist")
 
-        self.enable(False)
-
-        shutil.rmtree(self.env_dir)
+        self._remove()
 
     def init(self,
              r_version: Optional[str] = None,
@@ -151,7 +201,7 @@ class Environment:
                 raise ExistentEnvironment(
                     f"Environment {self.name} already existent in "
                     + f"{self.base_dir}")
-            self.remove()
+            self._remove()
 
         if r_executable_path is None:
             r_executable_path = _find_r_executable_path(r_version)
@@ -167,7 +217,7 @@ class Environment:
         self.lib_dir.mkdir(parents=True, exist_ok=False)
         self._create_initr()
         self._create_renv_config(r_executable_path)
-        self.enable(True)
+        self._set_enabled(True)
 
     def has_package(self, name: str, version: Union[str, None] = None) -> bool:
         """
@@ -199,14 +249,11 @@ class Environment:
         Returns: the package version or None if not present
 
         """
-        package_dir = self.lib_dir / name
-        if not package_dir.exists():
-            return None
-
-        description_path = package_dir / "DESCRIPTION"
-
+        # A missing package has no DESCRIPTION file either, which the
+        # parsing reports. No need to check the package directory first.
         try:
-            desc = Description.parse(description_path)
+            desc = Description.parse(
+                os.path.join(self.lib_dir, name, "DESCRIPTION"))
         except ParsingError:
             return None
 
@@ -221,8 +268,7 @@ class Environment:
         """Returns the R executable path to invoke for this environment.
         """
         try:
-            with open(self.env_dir / "renv.toml", "r", encoding="utf-8") as f:
-                data = toml.load(f)
+            data = self._read_renv_toml()
         except FileNotFoundError:
             data = {}
 
@@ -231,58 +277,32 @@ class Environment:
         except KeyError:
             raise KeyError("Unable to find executable path in renv.toml")
 
-    def _create_initr(self):
-        """Create an init.R file in case it doesn't exist"""
-        renv_path = self.env_reldir / "renv.toml"
-        code = textwrap.dedent(f"""
-            .parse_config_file <- function() {{
-                out <- list()
-                renv <- readLines('{renv_path.as_posix()}')
-                for (line_num in seq_along(renv)) {{
-                    line <- renv[[line_num]]
-                    m <- regmatches(
-                        line,
-                        regexec("(.+?)\\\\s*=\\\\s*(\\")(.+)(\\")",
-                        line, perl=TRUE)
-                    )
-
-                    key <- m[[1]][[2]]
-                    val <- m[[1]][[4]]
-                    out[[key]] <- val
-                }}
-
-                return(out)
-            }}
-            """
-                               )
-
-        code += textwrap.dedent(f"""
-            config <- .parse_config_file()
-            current_r_version <- paste0(R.version$major, ".", R.version$minor)
+    def _set_enabled(self, enabled: bool) -> None:
+        """Same as enable, without checking that the environment exists"""
+        rprofile_path = pathlib.Path(self.base_dir) / ".Rprofile"
+        name = self.name if enabled else None
+        RProfile(rprofile_path).enabled_environment = name
 
-            if (config$r_platform != R.version$platform ||
-                config$r_version != current_r_version) {{
-                stop(
-                    paste0(
-                        "Cannot use environment '{self.name}': ",
-                        "currently running R ",
-                        current_r_version, " ", R.version$platform,
-                        ", but environment is built for R ",
-                        config$r_version, " ", config$r_platform
-                    )
-                )
-            }}
+    def _remove(self) -> None:
+        """Same as remove, without checking that the environment exists"""
+        self._set_enabled(False)
+        shutil.rmtree(self.env_dir)
+        self._renv_toml = None
 
-            message(
-                paste0(
-                    'Using environment {self.name} ',
-                    '(R version: ', config$r_version, ', ',
-                    'platform: ', config$r_platform, ')'
-                )
-            )
-            .libPaths(c('{self.lib_reldir.as_posix()}'))
+    def _read_renv_toml(self) -> Dict:
+        """Returns the content of the renv.toml file of the environment.
+        The file is parsed only once, and the content kept afterwards."""
+        if self._renv_toml is None:
+            self._renv_toml = loads_toml(
+                decode_text((self.env_dir / "renv.toml").read_bytes()))
+        return self._renv_toml
 
-            """)
+    def _create_initr(self):
+        """Create an init.R file in case it doesn't exist"""
+        code = _INITR_TEMPLATE.format(
+            renv_path=(self.env_reldir / "renv.toml").as_posix(),
+            name=self.name,
+            lib_reldir=self.lib_reldir.as_posix())
 
         with open(self.env_dir / "init.R", "w", encoding="utf-8") as f:
             f.write(code)
@@ -295,12 +315,16 @@ class Environment:
         # we will parse it from the init later on so that if we accidentally
         # invoke the environment with the wrong version of R we can
         # stop and warn the user.
+        renv_toml = {
+            "r_executable_path": str(r_executable_path),
+            "r_version": version_info["version"],
+            "r_platform": version_info["platform"],
+        }
         with open(self.env_dir / "renv.toml", "w", encoding="utf-8") as f:
-            toml.dump({
-                "r_executable_path": str(r_executable_path),
-                "r_version": version_info["version"],
-                "r_platform": version_info["platform"],
-            }, f)
+            toml.dump(renv_toml, f)
+
+        # No need to read back what we just wrote.
+        self._renv_toml = renv_toml
 
 
 def available_environments(base_dir: pathlib.Path) -> List[Environment]:
@@ -308,17 +332,21 @@ def available_environments(base_dir: pathlib.Path) -> List[Environment]:
     Returns a list of all available environments in base_dir
     """
     environments: List[Environment] = []
-    if not (base_dir / ".envs").exists():
+    try:
+        with os.scandir(base_dir / ".envs") as it:
+            # Same check as Environment.exists(), but straight on the entry
+            # so that only the valid environments are instantiated.
+            names = [
+                entry.name for entry in it
+                if entry.is_dir()
+                and os.path.exists(os.path.join(entry.path, "init.R"))
+            ]
+    except FileNotFoundError:
         return environments
 
-    for entry in (base_dir / ".envs").iterdir():
-        if not entry.is_dir():
-            continue
-
+    for name in names:
         try:
-            env = Environment(base_dir, entry.name)
-            if env.exists():
-                environments.append(env)
+            environments.append(Environment(base_dir, name))
         except IOError:
             pass
 
@@ -329,8 +357,14 @@ def enabled_environment(base_dir: pathlib.Path) -> Union[Environment, None]:
     """Returns the currently active environment, or None if no
     active environment"""
 
+    # Parse the .Rprofile once, instead of once per environment as
+    # is_enabled() would do.
+    enabled_name = RProfile(base_dir / ".Rprofile").enabled_environment
+    if enabled_name is None:
+        return None
+
     for env in available_environments(base_dir):
-        if env.is_enabled():
+        if env.name == enabled_name:
             return env
 
     return None
@@ -378,22 +412,36 @@ _BASE_LINUX_R_INSTALL_PATH_LIST = [
     pathlib.Path("/usr/local/")
 ]
 
+# Patterns of the R home directory names and of the R --version output.
+_R_VERSION_DIR_RE = re.compile(r"R-(\d+\.\d+\.\d+)")
+_R_VERSION_DIR_SHORT_RE = re.compile(r"\d+\.\d+")
+_R_VERSION_TRIPLE_RE = re.compile(r"\d+\.\d+\.\d+")
+_R_VERSION_OUTPUT_RE = re.compile(r"R version\s*(\d\.\d\.\d)")
+
+# Seconds to wait for R --version, so that a hung R does not stall roo.
+_R_VERSION_TIMEOUT = 30
 
+
+@functools.lru_cache(maxsize=1)
 def find_all_installed_r_homes() -> List[Dict]:
     """Finds all available installed R homes.
     The order is arbitrary and depends on filesystem ordering.
     Priority must be decided outside.
+
+    The installed R homes do not change while roo runs, so the result is
+    computed once per process and shared. Do not modify it.
     """
     plat = platform.system()
     installed_r = []
     if plat == "Windows":
         try:
-            for entry in _BASE_WINDOWS_R_INSTALL_PATH.iterdir():
-                m = re.match(r"R-(\d+\.\d+\.\d+)", str(entry.name))
-                if m is not None:
+            for entry in _scan_dir(_BASE_WINDOWS_R_INSTALL_PATH):
+                m = _R_VERSION_DIR_RE.match(entry.name)
+                if m is not None and entry.is_dir():
+                    home_path = pathlib.Path(entry.path)
                     installed_r.append({
-                        "home_path": entry,
-                        "executable_path": entry / "bin" / "R.exe",
+                        "home_path": home_path,
+                        "executable_path": home_path / "bin" / "R.exe",
                         "version": m.group(1),
                         "active": True
                     })
@@ -401,14 +449,17 @@ def find_all_installed_r_homes() -> List[Dict]:
             pass
     elif plat == "Darwin":
         try:
-            for entry in (_BASE_MACOS_R_INSTALL_PATH / "Versions").iterdir():
-                if re.match(r"\d+\.\d+", str(entry.name)):
+            for entry in _scan_dir(_BASE_MACOS_R_INSTALL_PATH / "Versions"):
+                if (_R_VERSION_DIR_SHORT_RE.match(entry.name)
+                        and entry.is_dir()):
+                    home_path = pathlib.Path(entry.path)
                     version = _get_plist_version(
-                        entry / "Resources" / "Info.plist"
+                        home_path / "Resources" / "Info.plist"
                     )
                     installed_r.append({
-                        "home_path": entry,
-                        "executable_path": entry / "Resources" / "bin" / "R",
+                        "home_path": home_path,
+                        "executable_path":
+                            home_path / "Resources" / "bin" / "R",
                         "version": version,
                         "active": False,
                     })
@@ -436,6 +487,7 @@ def find_all_installed_r_homes() -> List[Dict]:
                 })
             except (FileNotFoundError,
                     subprocess.CalledProcessError,
+                    subprocess.TimeoutExpired,
                     KeyError):
                 logger.exception("Failed option")
 
@@ -444,56 +496,109 @@ def find_all_installed_r_homes() -> List[Dict]:
         # thing configurable
         try:
             base_path = pathlib.Path("/opt/R/")
-            for entry in base_path.iterdir():
+            for entry in _scan_dir(base_path):
                 logger.info(f"Trying {entry.name}")
-                if re.match(r"\d+\.\d+\.\d+", str(entry.name)):
-                    version = _get_r_version(entry / "bin" / "R")
+                if (_R_VERSION_TRIPLE_RE.match(entry.name)
+                        and entry.is_dir()):
+                    home_path = pathlib.Path(entry.path)
+                    version = _get_r_version(home_path / "bin" / "R")
                     installed_r.append({
-                        "home_path": entry,
-                        "executable_path": entry / "bin" / "R",
+                        "home_path": home_path,
+                        "executable_path": home_path / "bin" / "R",
                         "version": version,
                         "active": True,
                     })
         except (FileNotFoundError,
                 subprocess.CalledProcessError,
+                subprocess.TimeoutExpired,
                 KeyError):
             logger.exception("Failed option")
 
     return installed_r
 
 
+def find_r_home_for_version(version: str) -> Optional[Dict]:
+    """Finds the installed R home for a specific version on macOS.
+    Unlike find_all_installed_r_homes, only the installations whose
+    directory can contain that version are inspected.
+    Returns None if the version is not installed.
+    """
+    major_minor = ".".join(version.split(".")[:2])
+    dir_re = re.compile(rf"{re.escape(major_minor)}(\D|$)")
+    versions_path = _BASE_MACOS_R_INSTALL_PATH / "Versions"
+    try:
+        entries = _scan_dir(versions_path)
+    except FileNotFoundError:
+        return None
+
+    for entry in entries:
+        if not dir_re.match(entry.name) or not entry.is_dir():
+            continue
+
+        home_path = pathlib.Path(entry.path)
+        try:
+            entry_version = _get_plist_version(
+                home_path / "Resources" / "Info.plist")
+        except (FileNotFoundError, KeyError):
+            continue
+
+        if entry_version != version:
+            continue
+
+        try:
+            runnable_version = _get_plist_version(
+                versions_path / "Current" / "Resources" / "Info.plist")
+        except (FileNotFoundError, KeyError):
+            runnable_version = None
+
+        return {
+            "home_path": home_path,
+            "executable_path": home_path / "Resources" / "bin" / "R",
+            "version": version,
+            "active": runnable_version == version,
+        }
+
+    return None
+
+
+def _scan_dir(path: pathlib.Path) -> List[os.DirEntry]:
+    """Returns the entries of the directory at path.
+    Raises FileNotFoundError if the directory does not exist.
+    The entries answer is_dir() from the directory listing, without
+    an additional stat call (except for symlinks)."""
+    with os.scandir(path) as it:
+        return list(it)
+
+
 def _get_plist_version(path: pathlib.Path) -> str:
     """Extract the current version from the macos plist file"""
-    tree = ElementTree.parse(path)
-    root = tree.getroot()
-    if root.tag != "plist":
-        raise KeyError("Invalid plist file")
+    # Only needed on macOS, so not imported with the module.
+    import plistlib
+    from xml.parsers.expat import ExpatError
 
-    dict_ = root[0]
-    if dict_.tag != "dict":
-        raise KeyError("Invalid plist file")
+    with open(path, "rb") as f:
+        try:
+            data = plistlib.load(f)
+        except (plistlib.InvalidFileException, ExpatError) as e:
+            raise KeyError("Invalid plist file") from e
 
-    found_version = False
-    for entry in dict_:
-        if found_version:
-            if entry.tag == "string":
-                if entry.text is None:
-                    raise KeyError("Invalid plist file")
-                return entry.text
-            else:
-                raise KeyError("Invalid plist file")
-        if entry.tag == "key" and entry.text == "CFBundleVersion":
-            found_version = True
+    version = data.get("CFBundleVersion") if isinstance(data, dict) else None
+    if not isinstance(version, str):
+        raise KeyError("Invalid plist file")
 
-    raise KeyError("Invalid plist file")
+    return version
 
 
+@functools.lru_cache(maxsize=None)
 def _get_r_version(path: pathlib.Path) -> str:
-    """Extract the current version from the run of the R executable"""
+    """Extract the current version from the run of the R executable.
+    R is run at most once per path and process."""
 
-    output = subprocess.check_output([path, "--version"], encoding="utf-8")
+    output = subprocess.check_output(
+        [path, "--version"], encoding="utf-8",
+        timeout=_R_VERSION_TIMEOUT)
 
-    m = re.match(r"R version\s*(\d\.\d\.\d)", output)
+    m = _R_VERSION_OUTPUT_RE.match(output)
     if m is None:
         raise KeyError("Unable to find version in R output")
 
@@ -506,16 +611,14 @@ def _find_highest_active_version() -> Optional[Dict]:
     active_homes = filter(lambda x: x["active"] is True,
                           find_all_installed_r_homes())
 
-    try:
-        highest_version = sorted(
-            active_homes,
-            key=lambda x: [int(i) for i in x["version"].split(".")] +
-                          [x["executable_path"]],
-            reverse=True
-        )[0]
-        return highest_version
-    except IndexError:
-        return None
+    # The key is computed once per home. The path is compared as a string,
+    # to break ties between equal versions.
+    return max(
+        active_homes,
+        key=lambda x: (tuple(int(i) for i in x["version"].split(".")),
+                       str(x["executable_path"])),
+        default=None
+    )
 
 
 def _find_active_r_version(r_version: str) -> Optional[Dict]:
@@ -524,12 +627,8 @@ def _find_active_r_version(r_version: str) -> Optional[Dict]:
         find_all_installed_r_homes()
     )
 
-    try:
-        active_version = sorted(
-            active_homes,
-            key=lambda x: x["executable_path"],
-            reverse=True
-        )[0]
-        return active_version
-    except IndexError:
-        return None
+    return max(
+        active_homes,
+        key=lambda x: str(x["executable_path"]),
+        default=None
+    )
@@ -1,8 +1,41 @@
 import pathlib
+import logging
+from typing import IO
 
+import atomicwrites
+
+from ..exceptions import ExportError
 from ...parsers.lock import Lock
 
+logger = logging.getLogger(__name__)
+
+# Write buffer for the exported file. Entries are written one at a time,
+# so this keeps the number of write calls low even for large locks.
+_EXPORT_BUFSIZE = 64 * 1024
+
 
 class BaseExporter:
+    # Whether an existing file at the export path is replaced.
+    # If not, the export fails instead.
+    overwrite = False
+
     def export(self, lock: Lock, path: pathlib.Path):
-        pass
+        """Exports the lock to the file at path, which is written
+        atomically once the export is complete."""
+        if lock.has_vcs_packages():
+            raise ExportError("Unable to export locks with VCS packages")
+        try:
+            with atomicwrites.atomic_write(
+                    path, overwrite=self.overwrite, newline="",
+                    encoding="utf-8", buffering=_EXPORT_BUFSIZE) as f:
+                self.export_stream(lock, f)
+        except ExportError:
+            raise
+        except Exception as e:
+            logger.exception(f"Unable to export to {path}: {e}")
+            raise ExportError(f"{e}")
+
+    def export_stream(self, lock: Lock, f: IO[str]):
+        """Writes the exported lock to the text file f, incrementally
+        where the format allows it."""
+        raise NotImplementedError()
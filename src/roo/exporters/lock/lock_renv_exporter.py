@@ -1,26 +1,21 @@
-from typing import Dict
-import pathlib
-import logging
-import atomicwrites
+from typing import Dict, IO
 import json
 
 from ..exceptions import ExportError
 from .base_exporter import BaseExporter
-from ...parsers.lock import Lock, source_by_name, SourceLockEntry
-
-logger = logging.getLogger(__name__)
+from ...parsers.lock import Lock, SourceLockEntry
 
 
 class LockRenvExporter(BaseExporter):
-    def export(self, lock: Lock, path: pathlib.Path):
-        if lock.has_vcs_packages():
-            raise ExportError("Unable to export locks with VCS packages")
+    overwrite = True
 
+    def export_stream(self, lock: Lock, f: IO[str]):
         content: Dict[str, dict] = {
             "R": {
             }
         }
 
+        sources_by_name = {source.name: source for source in lock.sources}
         repositories = []
         for source in lock.sources:
             repositories.append({
@@ -38,7 +33,7 @@ class LockRenvExporter(BaseExporter):
         ]
 
         for entry in sorted(source_entries, key=lambda x: x.name):
-            source = source_by_name(lock.sources, entry.source)
+            source = sources_by_name[entry.source]
             # If md5s are not found, we cannot continue
 
             if entry.files[0].md5 is None:
@@ -57,10 +52,5 @@ class LockRenvExporter(BaseExporter):
             }
         content["Packages"] = packages
 
-        try:
-            with atomicwrites.atomic_write(
-                    path, overwrite=True, newline="", encoding="utf-8") as f:
-                json.dump(content, f, indent=4)
-        except Exception as e:
-            logger.exception(f"Unable to export to renv: {e}")
-            raise ExportError(f"{e}")
+        # json.dump writes the document piecewise as it is encoded.
+        json.dump(content, f, indent=4)
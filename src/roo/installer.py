@@ -1,6 +1,6 @@
 import logging
 import pathlib
-from typing import List, cast, Union, Optional
+from typing import List, cast, Union, Optional, Sequence
 
 from roo.caches.vcs_store import VCSStore
 from roo.semver import Version
@@ -58,7 +58,8 @@ class Installer:
     def install_lockfile(self,
                          lockfile: Lock,
                          environment: Environment,
-                         install_dep_categories: Optional[List] = None,
+                         install_dep_categories:
+                             Optional[Sequence[str]] = None,
                          ) -> None:
         """
         Installs the content of a given lockfile into an environment.
@@ -118,7 +119,7 @@ class Installer:
 
     def _build_install_plan(self,
                             deptree: RootDependency,
-                            install_dep_categories: List[str]
+                            install_dep_categories: Sequence[str]
                             ) -> Plan:
         """
         The install plan is a list of lists of dependencies to install.
@@ -126,14 +127,14 @@ class Installer:
         bottom of the dependency tree are yielded first.
         """
         layers = reversed(traverse_breadth_first_layered(deptree))
+        categories = frozenset(install_dep_categories)
 
         plan = []
         for layer in layers:
             layer_plan = []
             for dep in layer:
                 if (not isinstance(dep, RootDependency) and
-                        set(dep.categories).intersection(
-                            set(install_dep_categories))):
+                        not categories.isdisjoint(dep.categories)):
                     if not isinstance(dep, ResolvedDependency):
                         raise TypeError(
                             f"Cannot return a plan containing an "
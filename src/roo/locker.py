@@ -27,10 +27,7 @@ class Locker:
                           conservative: bool) -> bool:
         """Returns True if the lock file is synchronised with the
         rproject file. Otherwise false"""
-        return (
-            lock_file.metadata.content_hash == rproject.content_hash and
-            lock_file.metadata.conservative == conservative
-        )
+        return lock_file.is_sync(rproject.content_hash, conservative)
 
     def lock(self,
              rproject: RProject, old_lock: Lock, conservative: bool
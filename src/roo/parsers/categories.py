@@ -0,0 +1,5 @@
+"""The dependency categories of a project.
+Kept free of other imports, so that the command line can offer them
+without loading the project parser."""
+
+ALL_DEPENDENCY_CATEGORIES = ("main", "dev", "doc")
@@ -8,6 +8,7 @@ import toml
 import pathlib
 
 from ..parsers.exceptions import ParsingError
+from ..parsing_utils import decode_text, loads_toml
 
 
 @dataclasses.dataclass
@@ -174,6 +175,14 @@ class Lock:
         # represent the source path where this info came from.
         self.path: Optional[pathlib.Path] = None
 
+    def is_sync(self, content_hash: str, conservative: bool) -> bool:
+        """Returns True if the lock was created from a rproject file with
+        the given content hash, and with the same conservative mode"""
+        return (
+            self.metadata.content_hash == content_hash and
+            self.metadata.conservative == conservative
+        )
+
     def has_vcs_packages(self) -> bool:
         """Returns True if any of the packages is from a VCS source"""
         for entry in self.entries:
@@ -186,17 +195,47 @@ class Lock:
               fileobj_or_path: Union[TextIOWrapper, pathlib.Path]
               ) -> Lock:
         """Parses a file object or path."""
+        if isinstance(fileobj_or_path, TextIOWrapper):
+            return cls._from_toml_string(
+                fileobj_or_path.read(), pathlib.Path(fileobj_or_path.name))
+
+        path = pathlib.Path(fileobj_or_path)
+        # Reading the whole file at once is faster than letting the
+        # toml parser read from a text stream.
+        return cls.parse_bytes(path.read_bytes(), path)
+
+    @classmethod
+    def parse_bytes(cls,
+                    data: bytes,
+                    path: Optional[pathlib.Path] = None) -> Lock:
+        """Parses the content of a lock file.
+
+        Args:
+            data: the content of the file
+            path: the path the content comes from, if any
+
+        Returns: the Lock object
+        """
         try:
-            tomldata = toml.load(fileobj_or_path)
-        except toml.TomlDecodeError:
+            text = decode_text(data)
+        except UnicodeDecodeError:
             raise ParsingError(
                 "Toml file may be corrupted or in the wrong format"
             )
 
-        if isinstance(fileobj_or_path, TextIOWrapper):
-            original_path = pathlib.Path(fileobj_or_path.name)
-        else:
-            original_path = fileobj_or_path
+        return cls._from_toml_string(text, path)
+
+    @classmethod
+    def _from_toml_string(cls,
+                          text: str,
+                          original_path: Optional[pathlib.Path]) -> Lock:
+        """Parses the toml text of a lock file"""
+        try:
+            tomldata = loads_toml(text)
+        except ValueError:
+            raise ParsingError(
+                "Toml file may be corrupted or in the wrong format"
+            )
 
         self = cls()
 
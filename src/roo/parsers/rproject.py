@@ -1,6 +1,8 @@
 from __future__ import annotations
 import copy
+import functools
 import json
+import os
 import dataclasses
 import pathlib
 from hashlib import sha256
@@ -9,10 +11,11 @@ from typing import Optional, List, Dict, cast, Union, Any
 
 import atomicwrites
 import toml
-from toml.decoder import TomlDecodeError
 
 from ..semver import VersionConstraint, parse_constraint
+from ..parsers.categories import ALL_DEPENDENCY_CATEGORIES
 from ..parsers.exceptions import ParsingError
+from ..parsing_utils import decode_text, loads_toml
 
 
 @dataclasses.dataclass
@@ -92,7 +95,7 @@ class RProject:
     # Contains the original file data, purged of the tool.roo section.
     # Used to reconstruct the original file.
 
-    ALL_DEPENDENCY_CATEGORIES = ["main", "dev", "doc"]
+    ALL_DEPENDENCY_CATEGORIES = ALL_DEPENDENCY_CATEGORIES
 
     def dependencies_for_category(self, category: str) -> List[Dependency]:
         """Returns a list of dependencies for a given category"""
@@ -145,16 +148,39 @@ class RProject:
               ) -> RProject:
         """Parses the data and returns a RProject object"""
 
-        path: Optional[pathlib.Path]
-
         if isinstance(fileobj_or_path, (str, pathlib.Path)):
-            path = fileobj_or_path
-            with open(fileobj_or_path, encoding="utf-8") as f:
-                data = _read_fileobj(f)
-        else:
-            data = _read_fileobj(fileobj_or_path)
-            path = None
+            path = pathlib.Path(fileobj_or_path)
+            # Reading the whole file at once is faster than letting the
+            # toml parser read from a text stream.
+            return cls.parse_bytes(path.read_bytes(), path)
+
+        return cls._from_tomldata(_read_fileobj(fileobj_or_path), None)
+
+    @classmethod
+    def parse_bytes(cls,
+                    data: bytes,
+                    path: Optional[pathlib.Path] = None) -> RProject:
+        """
+        Parses the content of a rproject file and returns a RProject object
 
+        Args:
+            data: the content of the file
+            path: the path the content comes from, if any
+
+        Returns: the RProject object
+        """
+        try:
+            text = decode_text(data)
+        except UnicodeDecodeError as e:
+            raise ParsingError("Unable to parse rproject file: "+str(e))
+
+        return cls._from_tomldata(_read_string(text), path)
+
+    @classmethod
+    def _from_tomldata(cls,
+                       data: Dict[str, Any],
+                       path: Optional[pathlib.Path]) -> RProject:
+        """Creates the RProject object from the decoded toml data"""
         section = _pop_roo_section(data)
 
         rproject = cls()
@@ -165,6 +191,19 @@ class RProject:
 
         return rproject
 
+    @classmethod
+    def parse_cached(cls, path: pathlib.Path) -> RProject:
+        """
+        Parses the file at path, reusing the result of a previous parse
+        if the file has not changed in the meantime.
+        The returned RProject is a private copy, so it can be modified.
+        """
+        stat = os.stat(path)
+        rproject = copy.deepcopy(_parse_path_cached(
+            path.resolve(), stat.st_ino, stat.st_mtime_ns, stat.st_size))
+        rproject.path = path
+        return rproject
+
     def save(self):
         """Save the file to the path specified in self.path"""
         if self.path is None:
@@ -212,6 +251,17 @@ class RProject:
             toml.dump(rproject_content, f)
 
 
+@functools.lru_cache(maxsize=16)
+def _parse_path_cached(path: pathlib.Path,
+                       inode: int,
+                       mtime_ns: int,
+                       size: int) -> RProject:
+    """Parses the file at path. The inode, modification time and size are
+    only part of the cache key, so that a changed file is parsed again.
+    The result is shared, and must not be modified."""
+    return RProject.parse(path)
+
+
 def _parse_roo_section(rproject: RProject, section: dict):
     """
     Parses the relevant section from the data, and populates the
@@ -276,9 +326,14 @@ def _dependencies_for_category(roo_section: dict, category: str) -> list:
 
 def _read_fileobj(fileobj) -> Dict[str, Any]:
     """Parses the file object and returns its content as a dict"""
+    return _read_string(fileobj.read())
+
+
+def _read_string(text: str) -> Dict[str, Any]:
+    """Parses the toml text and returns its content as a dict"""
     try:
-        tomldata = cast(Dict[str, Any], toml.load(fileobj))
-    except TomlDecodeError as t:
+        tomldata = loads_toml(text)
+    except ValueError as t:
         raise ParsingError(f"Unable to decode rproject.toml file: {t}")
     except Exception as e:
         raise ParsingError("Unable to parse rproject file: "+str(e))
@@ -1,5 +1,17 @@
 import re
-from typing import List, Tuple
+import sys
+from typing import Any, Dict, List, Tuple, cast
+
+import toml
+
+if sys.version_info >= (3, 11):
+    import tomllib as fast_toml
+else:  # pragma: no cover
+    try:
+        # Backport of tomllib, distributed as a compiled wheel.
+        import tomli as fast_toml
+    except ImportError:
+        fast_toml = None
 
 
 def split_constraint_string(constraint_string: str) -> List[str]:
@@ -52,3 +64,29 @@ def split_deps_string(string: str) -> List[Tuple]:
         raise ValueError(f"Unable to parse dependency string: {string}")
 
     return result
+
+
+def decode_text(data: bytes) -> str:
+    """
+    Decodes utf-8 encoded file content, translating the newlines
+    as a file opened in text mode would do.
+
+    Raises UnicodeDecodeError if the data is not valid utf-8.
+    """
+    text = data.decode("utf-8")
+    if "\r" in text:
+        text = text.replace("\r\n", "\n").replace("\r", "\n")
+    return text
+
+
+def loads_toml(text: str) -> Dict[str, Any]:
+    """
+    Parses a toml document. The standard library parser (or its tomli
+    backport) is used if available, as it is much faster than the toml
+    package, which we only need to write the files.
+
+    Raises ValueError if the document is not valid toml.
+    """
+    if fast_toml is not None:
+        return cast(Dict[str, Any], fast_toml.loads(text))
+    return cast(Dict[str, Any], toml.loads(text))
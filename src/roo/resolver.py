@@ -13,7 +13,7 @@ from .deptree.dependencies import (
     ResolvedSourceDependency, ResolvedVCSDependency, ResolvedCoreDependency,
     UnresolvedDependency, UnresolvedConstrainedDependency,
     UnresolvedVCSDependency, StructuralDependency)
-from .deptree.traverse import traverse_depth_first_unique
+from .deptree.traverse import iter_depth_first_unique
 from .semver import VersionConstraint, parse_constraint, Version
 from .sources.dir_package import DirPackage
 from .sources.exceptions import PackageNotFoundError
@@ -71,7 +71,7 @@ class Resolver:
         top level dependencies, otherwise we would be unable to change a
         version in the rproject file
         """
-        for dep in traverse_depth_first_unique(old_tree):
+        for dep in iter_depth_first_unique(old_tree):
             if isinstance(dep, ResolvedDependency):
                 self.resolved_cache[dep.name] = dep
 
@@ -93,7 +93,7 @@ class Resolver:
             resolved_deps.append(resolved_dep)
 
         # At this point, we have a full first level resolution done.
-        root.dependencies = resolved_deps
+        root.dependencies = tuple(resolved_deps)
 
     def _resolve_single_dep(self,
                             parent: Union[RootDependency, ResolvedDependency],
@@ -130,8 +130,7 @@ class Resolver:
             logger.info(f"Dependency {dep.name} is a core dependency")
             resolved_dep = ResolvedCoreDependency(
                 name=dep.name,
-                categories=dep.categories,
-                dependencies=[]
+                categories=dep.categories
             )
         elif isinstance(dep, UnresolvedConstrainedDependency):
             resolved_dep = self._resolve_by_constraint(dep)
@@ -179,7 +178,7 @@ class Resolver:
             package=package,
             categories=unresolved.categories,
             r_constraint=_constraint_list_to_object(package.r_constraint),
-            dependencies=subdep_list
+            dependencies=tuple(subdep_list)
         )
 
         return resolved_dep
@@ -212,7 +211,7 @@ class Resolver:
             url=unresolved.url,
             ref=unresolved.ref,
             categories=unresolved.categories,
-            dependencies=subdep_list
+            dependencies=tuple(subdep_list)
         )
 
         vcs_store.clear()
@@ -248,7 +247,7 @@ class Resolver:
 
             resolved_deps.append(resolved_dep)
 
-        dependency.dependencies = resolved_deps
+        dependency.dependencies = tuple(resolved_deps)
 
     def _check_constraints(self,
                            parent: Union[RootDependency, ResolvedDependency],
@@ -367,7 +366,7 @@ def _extract_subdeps(package: PackageABC) -> List[StructuralDependency]:
         unresolved_subdep = UnresolvedConstrainedDependency(
             name=subdep.name,
             constraint=_constraint_list_to_object(subdep.constraint),
-            categories=[]
+            categories=frozenset()
         )
         subdep_list.append(unresolved_subdep)
 
@@ -1,8 +1,13 @@
+import gzip
 import os
 import pathlib
+import tarfile
+from unittest import mock
+
+import pytest
 from tests.conftest import chdir, FIXTURE_DIR
 
-from roo.caches.build_cache import BuildCache
+from roo.caches.build_cache import BuildCache, all_build_caches
 
 
 def test_build_cache(tmpdir_factory):
@@ -16,12 +21,142 @@ def test_build_cache(tmpdir_factory):
         build_cache.add_build("dummy", "1.3.3", pathlib.Path("Rchecker"))
 
     assert build_cache.has_build("dummy", "1.3.3")
-    assert (
-        pathlib.Path(tmpdir) / "build" / "3.6.0" /
-        "x86_64-apple-darwin15.6.0" / "dummy_1.3.3.tar.gz"
-    ).exists()
+    assert build_cache.list_builds() == [("dummy", "1.3.3")]
 
     tmpdir2 = tmpdir_factory.mktemp("base")
 
     build_cache.restore_build("dummy", "1.3.3", tmpdir2)
     assert os.listdir(tmpdir2) == ["DESCRIPTION"]
+
+
+@pytest.mark.parametrize("same_filesystem", [True, False])
+@pytest.mark.parametrize("use_zstandard", [True, False])
+def test_build_cache_storage(tmpdir_factory, optional_module,
+                             same_filesystem, use_zstandard):
+    optional_module("roo.caches.build_cache.zstandard", use_zstandard)
+
+    tmpdir = tmpdir_factory.mktemp("base")
+
+    build_cache = BuildCache(
+        "3.6.0", "x86_64-apple-darwin15.6.0", root_dir=pathlib.Path(tmpdir))
+
+    with mock.patch("roo.caches.build_cache._same_filesystem",
+                    return_value=same_filesystem):
+        pkg_path = build_cache.add_build(
+            "dummy", "1.3.3", FIXTURE_DIR / "Rchecker")
+
+        assert pkg_path.is_dir() == same_filesystem
+        assert build_cache.list_builds() == [("dummy", "1.3.3")]
+
+        tmpdir2 = tmpdir_factory.mktemp("base")
+        build_cache.restore_build("dummy", "1.3.3", tmpdir2)
+    assert os.listdir(tmpdir2) == ["DESCRIPTION"]
+
+    build_cache.clear_build("dummy", "1.3.3")
+    assert not build_cache.has_build("dummy", "1.3.3")
+    assert os.listdir(build_cache.base_dir) == []
+
+
+def test_build_cache_restores_legacy_gzip(tmpdir_factory):
+    tmpdir = tmpdir_factory.mktemp("base")
+
+    build_cache = BuildCache(
+        "3.6.0", "x86_64-apple-darwin15.6.0", root_dir=pathlib.Path(tmpdir))
+
+    with tarfile.open(
+            build_cache.base_dir / "dummy_1.3.3.tar.gz", "w:gz") as targz:
+        targz.add(str(FIXTURE_DIR / "Rchecker"), arcname=".")
+
+    assert build_cache.has_build("dummy", "1.3.3")
+
+    tmpdir2 = tmpdir_factory.mktemp("base")
+    build_cache.restore_build("dummy", "1.3.3", tmpdir2)
+    assert os.listdir(tmpdir2) == ["DESCRIPTION"]
+
+    build_cache.clear_build("dummy")
+    assert not build_cache.has_build("dummy", "1.3.3")
+
+
+class _StubRapidgzip:
+    """Stands in for rapidgzip, which is not always installed."""
+    def __init__(self):
+        self.opened = []
+
+    def open(self, path, parallelization):
+        self.opened.append(path)
+        return gzip.GzipFile(path, "rb")
+
+
+@pytest.mark.parametrize("min_size,parallel", [
+    (0, True),
+    (1024 * 1024 * 1024, False),
+])
+def test_build_cache_restores_gzip_in_parallel(
+        tmpdir_factory, monkeypatch, min_size, parallel):
+    stub = _StubRapidgzip()
+    monkeypatch.setattr("roo.caches.build_cache.rapidgzip", stub)
+    monkeypatch.setattr(
+        "roo.caches.build_cache._PARALLEL_GZIP_MIN_SIZE", min_size)
+
+    tmpdir = tmpdir_factory.mktemp("base")
+    build_cache = BuildCache(
+        "3.6.0", "x86_64-apple-darwin15.6.0", root_dir=pathlib.Path(tmpdir))
+    archive_path = build_cache.base_dir / "dummy_1.3.3.tar.gz"
+    with tarfile.open(archive_path, "w:gz") as targz:
+        targz.add(str(FIXTURE_DIR / "Rchecker"), arcname=".")
+
+    tmpdir2 = tmpdir_factory.mktemp("base")
+    build_cache.restore_build("dummy", "1.3.3", tmpdir2)
+    assert os.listdir(tmpdir2) == ["DESCRIPTION"]
+
+    # Below the size threshold, plain gzip is used instead.
+    assert stub.opened == ([str(archive_path)] if parallel else [])
+
+
+def test_build_cache_restores_gzip_without_rapidgzip(
+        tmpdir_factory, monkeypatch, optional_module):
+    optional_module("roo.caches.build_cache.rapidgzip", False)
+    monkeypatch.setattr("roo.caches.build_cache._PARALLEL_GZIP_MIN_SIZE", 0)
+
+    tmpdir = tmpdir_factory.mktemp("base")
+    build_cache = BuildCache(
+        "3.6.0", "x86_64-apple-darwin15.6.0", root_dir=pathlib.Path(tmpdir))
+    with tarfile.open(
+            build_cache.base_dir / "dummy_1.3.3.tar.gz", "w:gz") as targz:
+        targz.add(str(FIXTURE_DIR / "Rchecker"), arcname=".")
+
+    tmpdir2 = tmpdir_factory.mktemp("base")
+    build_cache.restore_build("dummy", "1.3.3", tmpdir2)
+    assert os.listdir(tmpdir2) == ["DESCRIPTION"]
+
+
+def test_all_build_caches(tmpdir):
+    root_dir = pathlib.Path(tmpdir)
+    assert all_build_caches(root_dir) == []
+
+    BuildCache("3.6.0", "x86_64-apple-darwin15.6.0", root_dir).base_dir
+    BuildCache("4.1.2", "x86_64-pc-linux-gnu", root_dir).base_dir
+
+    caches = all_build_caches(root_dir)
+    assert sorted((c.r_version, c.platform) for c in caches) == [
+        ("3.6.0", "x86_64-apple-darwin15.6.0"),
+        ("4.1.2", "x86_64-pc-linux-gnu"),
+    ]
+
+
+def test_build_cache_list_builds(tmpdir):
+    build_cache = BuildCache(
+        "3.6.0", "x86_64-apple-darwin15.6.0", root_dir=pathlib.Path(tmpdir))
+
+    base_dir = build_cache.base_dir
+    (base_dir / "data.table_1.14.2.d").mkdir()
+    (base_dir / "R6_2.5.1.tar.gz").touch()
+    (base_dir / "zoo_1.8-9.tar.zst").touch()
+    (base_dir / "zoo_1.8-9.abcdef.partial").mkdir()
+    (base_dir / "notabuild.txt").touch()
+
+    assert sorted(build_cache.list_builds()) == [
+        ("R6", "2.5.1"),
+        ("data.table", "1.14.2"),
+        ("zoo", "1.8-9"),
+    ]
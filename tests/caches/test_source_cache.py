@@ -1,4 +1,12 @@
+import hashlib
+import os
+import pathlib
+from unittest import mock
+
+import pytest
+
 from roo.caches.source_cache import SourceCache
+from tests.conftest import FIXTURE_DIR
 
 
 def test_source_cache():
@@ -7,5 +15,88 @@ def test_source_cache():
     assert str(cache.root_dir).endswith(".roo/cache")
     assert str(cache.base_dir).endswith(
         ".roo/cache/source/remote/cran.r-project.org/"
-        "e3b0c44298fc1c149afbf4c8996fb92427ae41e4649b934ca495991b7852b855"
+        "cae66941d9efbd404e4d88758ea67670"
     )
+
+
+def test_source_cache_migrates_legacy_dir(tmpdir):
+    root_dir = pathlib.Path(tmpdir)
+    location_dir = root_dir / "source" / "remote" / "cran.r-project.org"
+    legacy_dir = location_dir / hashlib.sha256(b"").hexdigest()
+    (legacy_dir / "Rchecker").mkdir(parents=True)
+    with open(legacy_dir.with_suffix(".json"), "w") as f:
+        f.write('{"source_url": "http://cran.r-project.org"}')
+
+    cache = SourceCache("http://cran.r-project.org", root_dir=root_dir)
+
+    assert not legacy_dir.exists()
+    assert not legacy_dir.with_suffix(".json").exists()
+    assert cache.base_dir.with_suffix(".json").exists()
+    assert cache.cached_package_names() == ["Rchecker"]
+
+
+@pytest.mark.parametrize("use_libarchive", [True, False])
+def test_package_description_file(tmpdir, optional_module, use_libarchive):
+    optional_module("roo.caches.source_cache.libarchive", use_libarchive)
+    _check_package_description_file(tmpdir)
+
+
+def _check_package_description_file(tmpdir):
+    cache = SourceCache(
+        "http://cran.r-project.org", root_dir=pathlib.Path(tmpdir))
+
+    assert cache.get_package_description_file("Rchecker", "1.0.0") is None
+    assert list(cache.package_meta_dir("Rchecker", "1.0.0").iterdir()) == []
+
+    cache.add_package_file(
+        "Rchecker", "1.0.0",
+        FIXTURE_DIR / "LocalCRAN" / "src" / "contrib" /
+        "Rchecker_1.0.0.tar.gz")
+    assert cache.has_package_file("Rchecker", "1.0.0")
+
+    description_path = cache.get_package_description_file(
+        "Rchecker", "1.0.0")
+    assert description_path is not None
+    with open(description_path) as f:
+        assert "Package: Rchecker" in f.read()
+
+
+def test_add_package_file_copies(tmpdir):
+    cache = SourceCache(
+        "http://cran.r-project.org", root_dir=pathlib.Path(tmpdir) / "cache")
+    local_path = pathlib.Path(tmpdir) / "Rchecker_1.0.0.tar.gz"
+    local_path.write_bytes(b"original")
+
+    pkg_path = cache.add_package_file("Rchecker", "1.0.0", local_path)
+
+    # Rewriting the original in place must not affect the cache.
+    with open(local_path, "r+b") as f:
+        f.write(b"modified")
+    assert pkg_path.read_bytes() == b"original"
+
+
+def test_add_package_file_concurrent(tmpdir):
+    cache = SourceCache(
+        "http://cran.r-project.org", root_dir=pathlib.Path(tmpdir) / "cache")
+    local_path = pathlib.Path(tmpdir) / "Rchecker_1.0.0.tar.gz"
+    local_path.write_bytes(b"content")
+    pkg_path, _ = cache._package_paths_for("Rchecker", "1.0.0")
+
+    def _concurrent_replace(src, dst):
+        # Another process placed the package, and it cannot be replaced.
+        pathlib.Path(dst).write_bytes(b"content")
+        raise PermissionError("in use")
+
+    with mock.patch("os.replace", side_effect=_concurrent_replace):
+        assert cache.add_package_file(
+            "Rchecker", "1.0.0", local_path) == pkg_path
+
+    assert sorted(os.listdir(pkg_path.parent)) == [pkg_path.name]
+
+    # If the package is still missing, the error is reported.
+    pkg_path.unlink()
+    with mock.patch("os.replace", side_effect=PermissionError("denied")):
+        with pytest.raises(PermissionError):
+            cache.add_package_file("Rchecker", "1.0.0", local_path)
+
+    assert os.listdir(pkg_path.parent) == []
@@ -1,7 +1,12 @@
+import os
 import pathlib
 import shutil
+import subprocess
+import sys
+from unittest import mock
 
 from click.testing import CliRunner
+from roo.cli.__main__ import main
 from roo.cli.cache import cache_clear
 from roo.cli.environment import environment_init
 from roo.cli.export import export_lock
@@ -13,12 +18,43 @@ from roo.cli.package import package_dependencies
 from tests.conftest import chdir
 
 
+def test_main_lists_lazy_commands():
+    runner = CliRunner()
+    result = runner.invoke(main, ["--help"])
+    assert result.exit_code == 0
+    for name in ["add", "cache", "ci", "environment", "export", "init",
+                 "install", "lock", "package", "rswitch", "run"]:
+        assert name in result.output
+
+    result = runner.invoke(main, ["cache", "--help"])
+    assert result.exit_code == 0
+    assert "Commands to interact with the cache" in result.output
+
+
+def test_main_import_is_light():
+    # The commands load their modules only when invoked, so the project
+    # parser must not be loaded just to start the command line.
+    code = ("import sys, roo.cli.__main__; "
+            "print('roo.parsers.rproject' in sys.modules)")
+    output = subprocess.check_output(
+        [sys.executable, "-c", code], encoding="utf-8",
+        env=dict(os.environ, PYTHONPATH=os.pathsep.join(sys.path)))
+    assert output.strip() == "False"
+
+
 def test_init(tmpdir):
     runner = CliRunner()
     with chdir(tmpdir):
         result = runner.invoke(init)
         assert result.exit_code == 0
         assert pathlib.Path("rproject.toml").exists()
+        content = pathlib.Path("rproject.toml").read_text()
+        assert "myproject" in content
+
+        result = runner.invoke(init)
+        assert result.exit_code == 1
+        assert "already present" in result.output
+        assert pathlib.Path("rproject.toml").read_text() == content
 
 
 def test_environment_init(tmpdir):
@@ -58,6 +94,31 @@ def test_cache_clear():
     assert not pathlib.Path("~/.roo/cache/testfile").expanduser().exists()
 
 
+def test_cache_clear_leftovers():
+    cache_dir = pathlib.Path("~/.roo/cache").expanduser()
+    cache_dir.mkdir(parents=True, exist_ok=True)
+
+    # Left behind by an interrupted clear.
+    leftover_dir = cache_dir.with_name("cache.0123456789.deleting")
+    (leftover_dir / "source").mkdir(parents=True, exist_ok=True)
+
+    runner = CliRunner()
+    res = runner.invoke(cache_clear)
+    assert res.exit_code == 0
+    assert not leftover_dir.exists()
+
+    # Failures are reported, with the directory to remove.
+    with mock.patch("roo.cli.cache._parallel_rmtree",
+                    side_effect=PermissionError("denied")):
+        res = runner.invoke(cache_clear)
+    assert res.exit_code == 1
+    assert "cache." in res.output and ".deleting" in res.output
+    assert "denied" in res.output
+
+    runner.invoke(cache_clear)
+    assert list(cache_dir.parent.glob("cache.*.deleting")) == []
+
+
 def test_lock_overwrite(tmpdir):
     runner = CliRunner()
 
@@ -78,6 +139,29 @@ def test_lock_overwrite(tmpdir):
         assert result.exit_code == 0
 
 
+def test_lock_already_synchronized(tmpdir):
+    runner = CliRunner()
+
+    with chdir(tmpdir):
+        toml_path = pathlib.Path(".") / "rproject.toml"
+        with open(toml_path, "w") as f:
+            f.write("[tool.roo]\n")
+            f.write("repositories = []\n")
+            f.write("[tool.roo.dependencies]")
+
+        # Creates the lock for the first time
+        result = runner.invoke(lock)
+        assert result.exit_code == 0
+        lock_path = pathlib.Path(".") / "roo.lock"
+        mtime_ns = lock_path.stat().st_mtime_ns
+
+        # The lock is in sync, so it is neither recreated nor rewritten
+        result = runner.invoke(lock)
+        assert result.exit_code == 0
+        assert "already synchronized" in result.output
+        assert lock_path.stat().st_mtime_ns == mtime_ns
+
+
 def test_export_lock(fixture_file, tmpdir):
     runner = CliRunner()
 
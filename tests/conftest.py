@@ -1,4 +1,5 @@
 import contextlib
+import importlib
 import os
 import pathlib
 
@@ -17,6 +18,26 @@ def fixture_file():
     return _fixture_file
 
 
+@pytest.fixture
+def optional_module(monkeypatch):
+    """Returns a function to run the test with or without an optional
+    backend. The backend is given as the dotted path of the module
+    attribute holding it, which is None when it is not installed.
+    If the test requires a backend that is not installed, it is skipped.
+    """
+    def _optional_module(attr_path: str, enabled: bool):
+        if not enabled:
+            monkeypatch.setattr(attr_path, None)
+            return
+
+        module_name, attr_name = attr_path.rsplit(".", 1)
+        module = importlib.import_module(module_name)
+        if getattr(module, attr_name) is None:
+            pytest.skip(f"{attr_path} is not available")
+
+    return _optional_module
+
+
 @contextlib.contextmanager
 def chdir(path: pathlib.Path):
     curpath = pathlib.Path.cwd()
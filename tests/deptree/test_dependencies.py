@@ -1,2 +1,49 @@
+from roo.deptree.dependencies import ResolvedCoreDependency, \
+    UnresolvedDependency
+
+
 def test_add_categories_recursive():
-    pass
+    unresolved = UnresolvedDependency(name="foo", categories=["main"])
+    shared = ResolvedCoreDependency(
+        name="shared", categories=["main"], dependencies=[unresolved])
+    left = ResolvedCoreDependency(
+        name="left", categories=["main"], dependencies=[shared])
+    right = ResolvedCoreDependency(
+        name="right", categories=["main"], dependencies=[shared])
+    top = ResolvedCoreDependency(
+        name="top", categories=["main"], dependencies=[left, right])
+
+    top.add_categories_recursive(["dev", "main"])
+
+    for dep in [top, left, right, shared, unresolved]:
+        assert dep.categories == {"dev", "main"}
+
+    # Adding a category to a subtree leaves its parents alone.
+    left.add_categories_recursive(["doc"])
+    assert top.categories == {"dev", "main"}
+    assert right.categories == {"dev", "main"}
+    for dep in [left, shared, unresolved]:
+        assert dep.categories == {"dev", "doc", "main"}
+
+
+def test_core_dependency_default_dependencies():
+    base = ResolvedCoreDependency(name="base", categories=["main"])
+    stats = ResolvedCoreDependency(name="stats", categories=["main"])
+
+    assert base.dependencies == ()
+    assert base.dependencies is stats.dependencies
+
+
+def test_add_categories_recursive_below_complete_node():
+    # The parent already has the category, but its child does not,
+    # e.g. because the child was attached during the resolution.
+    child = ResolvedCoreDependency(name="child", categories=["main"])
+    parent = ResolvedCoreDependency(
+        name="parent", categories=["main", "dev"], dependencies=[child])
+    top = ResolvedCoreDependency(
+        name="top", categories=["main"], dependencies=[parent])
+
+    top.add_categories_recursive(["dev"])
+
+    for dep in [top, parent, child]:
+        assert dep.categories == {"dev", "main"}
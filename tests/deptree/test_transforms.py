@@ -0,0 +1,54 @@
+import pytest
+
+from roo.deptree.dependencies import RootDependency, \
+    ResolvedCoreDependency, ResolvedVCSDependency, UnresolvedDependency
+from roo.deptree.transforms import deptree_to_lock_entries, \
+    lock_entries_to_deptree
+from roo.parsers.lock import RootLockEntry, CoreLockEntry, VCSLockEntry
+from roo.sources.source_group import SourceGroup
+
+
+def test_deptree_to_lock_entries():
+    core = ResolvedCoreDependency(
+        name="utils", categories=["main"], dependencies=[])
+    vcs = ResolvedVCSDependency(
+        name="foo", categories=["main"], dependencies=[core],
+        vcs_type="git", url="https://example.com/foo.git", ref=None)
+    root = RootDependency(dependencies=[vcs])
+
+    entries = deptree_to_lock_entries(root)
+
+    assert [type(e) for e in entries] == [
+        RootLockEntry, VCSLockEntry, CoreLockEntry]
+    assert entries[0].dependencies == ["foo"]
+    assert entries[1].dependencies == ["utils"]
+    assert entries[1].url == "https://example.com/foo.git"
+    assert entries[2].dependencies == []
+
+
+def test_deptree_to_lock_entries_unresolved():
+    root = RootDependency(dependencies=[
+        UnresolvedDependency(name="foo", categories=[])])
+    with pytest.raises(TypeError):
+        deptree_to_lock_entries(root)
+
+
+def test_lock_entries_to_deptree():
+    entries = [
+        RootLockEntry(categories=[], dependencies=["foo"]),
+        VCSLockEntry(name="foo", categories=["main"], dependencies=["utils"],
+                     vcs_type="git", url="https://example.com/foo.git",
+                     ref=None),
+        CoreLockEntry(name="utils", categories=["main"], dependencies=[]),
+    ]
+
+    root = lock_entries_to_deptree(SourceGroup(), entries)
+
+    foo = root.dependencies[0]
+    assert isinstance(foo, ResolvedVCSDependency)
+    assert foo.url == "https://example.com/foo.git"
+    utils = foo.dependencies[0]
+    assert isinstance(utils, ResolvedCoreDependency)
+    assert utils.name == "utils"
+
+    assert deptree_to_lock_entries(root) == entries
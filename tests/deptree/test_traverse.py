@@ -0,0 +1,63 @@
+import pytest
+
+from roo.deptree.dependencies import RootDependency, \
+    ResolvedCoreDependency, UnresolvedDependency
+from roo.deptree.traverse import traverse_depth_first, \
+    traverse_depth_first_unique, iter_depth_first_unique, \
+    traverse_breadth_first, traverse_breadth_first_layered
+
+
+def _diamond():
+    shared = ResolvedCoreDependency(
+        name="shared", categories=[], dependencies=[])
+    left = ResolvedCoreDependency(
+        name="left", categories=[], dependencies=[shared])
+    right = ResolvedCoreDependency(
+        name="right", categories=[], dependencies=[shared])
+    return RootDependency(dependencies=[left, right, shared])
+
+
+def test_traverse_depth_first_unique():
+    root = _diamond()
+    names = [
+        getattr(dep, "name", "")
+        for dep in traverse_depth_first_unique(root)
+    ]
+    assert names == ["", "left", "right", "shared"]
+
+    # Same order as the first occurrences in the full traversal.
+    first_seen = {}
+    for dep in traverse_breadth_first(root):
+        first_seen.setdefault(getattr(dep, "name", ""), None)
+    assert names == list(first_seen)
+
+
+def test_traverse_depth_first_unique_unresolved():
+    root = RootDependency(dependencies=[
+        UnresolvedDependency(name="foo", categories=[])])
+    with pytest.raises(TypeError):
+        traverse_depth_first_unique(root)
+
+    # The iterator only fails once it reaches the unresolved node.
+    nodes = iter_depth_first_unique(root)
+    assert next(nodes) is root
+    with pytest.raises(TypeError):
+        next(nodes)
+
+
+def test_traverse_breadth_first():
+    root = _diamond()
+    layers = traverse_breadth_first_layered(root)
+    assert [[getattr(dep, "name", "") for dep in layer]
+            for layer in layers] == [
+        [""], ["left", "right", "shared"], ["shared", "shared"]]
+
+    assert list(traverse_breadth_first(root)) == [
+        dep for layer in layers for dep in layer]
+
+
+def test_traverse_depth_first():
+    root = _diamond()
+    assert [getattr(dep, "name", "")
+            for dep in traverse_depth_first(root)] == [
+        "", "left", "right", "shared", "shared", "shared"]
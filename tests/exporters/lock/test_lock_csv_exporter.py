@@ -1,6 +1,9 @@
 import csv
 import pathlib
 
+import pytest
+
+from roo.exporters.exceptions import ExportError
 from roo.exporters.lock.lock_csv_exporter import LockCSVExporter
 from roo.parsers.lock import Lock
 
@@ -24,3 +27,14 @@ def test_lock_csv_export(fixture_file, tmpdir):
          'rlang_0.4.2.tar.gz',
          'sha256:fbd1c9cb81c94f769bd57079d7ef0682f27b971181340b2ed1e3ab79c2659f39',  # noqa: E501
          'main']]
+
+
+def test_lock_csv_export_existing(fixture_file, tmpdir):
+    lockfile = Lock.parse(fixture_file("simple", "roo.lock"))
+    csv_file = pathlib.Path(tmpdir, "roo.csv")
+    csv_file.write_text("old content")
+
+    with pytest.raises(ExportError):
+        LockCSVExporter().export(lockfile, csv_file)
+
+    assert csv_file.read_text() == "old content"
@@ -129,3 +129,39 @@ bar = "1.2.0"
 [tool.roo.dev-dependencies]
 baz = "1.2.0"
 """
+
+
+def test_rproject_parse_cached(tmpdir):
+    path = pathlib.Path(tmpdir) / "rproject.toml"
+    with open(path, "w", encoding="utf-8") as f:
+        f.write('[tool.roo.dependencies]\nfoo = "1.2.0"\n')
+
+    rproject = RProject.parse_cached(path)
+    assert rproject.path == path
+    assert [d.name for d in rproject.dependencies] == ["foo"]
+
+    # Each caller gets its own copy that it can modify.
+    rproject.dependencies.append(
+        Dependency(name="bar",
+                   constraint=parse_constraint("1.2.0"),
+                   category="main",
+                   vcs_spec=None
+                   )
+    )
+    assert [d.name for d in RProject.parse_cached(path).dependencies] == [
+        "foo"]
+
+    # A modified file is parsed again.
+    rproject.save()
+    assert [d.name for d in RProject.parse_cached(path).dependencies] == [
+        "foo", "bar"]
+
+
+def test_rproject_parse_bytes():
+    rproject = RProject.parse_bytes(
+        b'[tool.roo.dependencies]\r\nfoo = "1.2.0"\r\n')
+    assert rproject.path is None
+    assert [d.name for d in rproject.dependencies] == ["foo"]
+
+    with pytest.raises(ParsingError):
+        RProject.parse_bytes(b"\xff\xfe")
@@ -5,8 +5,10 @@ from unittest import mock
 import pytest
 
 from roo.environment import Environment, ExistentEnvironment, \
-    find_all_installed_r_homes, _get_plist_version, \
-    _find_highest_active_version, _find_active_r_version
+    find_all_installed_r_homes, find_r_home_for_version, \
+    _get_plist_version, \
+    _find_highest_active_version, _find_active_r_version, \
+    enabled_environment
 from roo.files.rprofile import RProfile
 from roo.installer import Installer
 from roo.parsers.lock import Lock
@@ -17,6 +19,14 @@ class MockPackage:
     pass
 
 
+@pytest.fixture(autouse=True)
+def clear_r_homes_cache():
+    # The R homes are cached per process, but the tests fake them.
+    find_all_installed_r_homes.cache_clear()
+    yield
+    find_all_installed_r_homes.cache_clear()
+
+
 def test_create_environment(tmpdir):
     env = Environment(base_dir=pathlib.Path(tmpdir), name="hello")
     assert env.base_dir == tmpdir
@@ -72,6 +82,27 @@ def test_create_additional_environment(tmpdir):
         pathlib.Path(tmpdir, ".Rprofile")).enabled_environment == "hello2"
 
 
+def test_enabled_environment(tmpdir):
+    base_dir = pathlib.Path(tmpdir)
+    assert enabled_environment(base_dir) is None
+
+    for name in ["hello", "hello2"]:
+        env_dir = base_dir / ".envs" / name
+        env_dir.mkdir(parents=True)
+        (env_dir / "init.R").touch()
+
+    assert enabled_environment(base_dir) is None
+
+    RProfile(base_dir / ".Rprofile").enabled_environment = "hello2"
+    env = enabled_environment(base_dir)
+    assert env is not None
+    assert env.name == "hello2"
+
+    # The enabled environment has been removed
+    RProfile(base_dir / ".Rprofile").enabled_environment = "hello3"
+    assert enabled_environment(base_dir) is None
+
+
 def test_has_package(tmpdir, fixture_file):
     env = Environment(base_dir=pathlib.Path(tmpdir), name="hello")
     env.init()
@@ -116,6 +147,22 @@ def test_version_info(tmpdir):
     assert "platform" in env.r_version_info
 
 
+def test_renv_toml_read_once(tmpdir):
+    env = Environment(base_dir=pathlib.Path(tmpdir), name="hello")
+    env.env_dir.mkdir(parents=True)
+    renv_path = env.env_dir / "renv.toml"
+    renv_path.write_text(
+        'r_executable_path = "/usr/bin/R"\n'
+        'r_version = "4.1"\n'
+        'r_platform = "x86_64-pc-linux-gnu"\n')
+
+    assert env.r_version_info == {
+        "version": "4.1", "platform": "x86_64-pc-linux-gnu"}
+
+    renv_path.unlink()
+    assert env.r_executable_path == pathlib.Path("/usr/bin/R")
+
+
 def test_find_all_installed_r(fixture_file):
     with mock.patch("platform.system") as mock_system, \
             mock.patch("roo.environment._BASE_WINDOWS_R_INSTALL_PATH",
@@ -149,6 +196,7 @@ def test_find_all_installed_r(fixture_file):
 
             assert entry in installed
 
+    find_all_installed_r_homes.cache_clear()
     with mock.patch("platform.system") as mock_system, \
             mock.patch("roo.environment._BASE_MACOS_R_INSTALL_PATH",
                        pathlib.Path(fixture_file(
@@ -180,11 +228,51 @@ def test_find_all_installed_r(fixture_file):
             assert entry in installed
 
 
+def test_find_all_installed_r_skips_files(tmpdir):
+    base_path = pathlib.Path(tmpdir)
+    (base_path / "R-4.1.0").mkdir()
+    (base_path / "R-4.2.0.exe").write_text("")
+
+    with mock.patch("platform.system") as mock_system, \
+            mock.patch("roo.environment._BASE_WINDOWS_R_INSTALL_PATH",
+                       base_path):
+        mock_system.return_value = "Windows"
+
+        installed = find_all_installed_r_homes()
+        assert [entry["version"] for entry in installed] == ["4.1.0"]
+
+
+def test_find_r_home_for_version(fixture_file):
+    with mock.patch("roo.environment._BASE_MACOS_R_INSTALL_PATH",
+                    pathlib.Path(fixture_file(
+                        "r_installation_paths", "macos"))
+                    ):
+        assert find_r_home_for_version("4.1.2") == {
+            "home_path": fixture_file(
+                "r_installation_paths", "macos", "Versions", "4.1"),
+            "executable_path": fixture_file(
+                "r_installation_paths", "macos", "Versions", "4.1",
+                "Resources", "bin", "R"),
+            "version": "4.1.2",
+            "active": False
+        }
+        assert find_r_home_for_version("3.6.0")["active"] is True
+        assert find_r_home_for_version("4.1.0") is None
+        assert find_r_home_for_version("4.2.0") is None
+
+
 def test_get_plist_version(fixture_file):
     version = _get_plist_version(fixture_file("Info.plist"))
     assert version == "3.6.0"
 
 
+def test_get_plist_version_invalid(tmpdir):
+    plist_path = pathlib.Path(tmpdir) / "Info.plist"
+    plist_path.write_text("not a plist")
+    with pytest.raises(KeyError):
+        _get_plist_version(plist_path)
+
+
 def test_find_highest_version(fixture_file):
     with mock.patch("platform.system") as mock_system, \
             mock.patch("roo.environment._BASE_WINDOWS_R_INSTALL_PATH",
@@ -1,4 +1,7 @@
-from roo.parsing_utils import split_deps_string, split_constraint_string
+import pytest
+
+from roo.parsing_utils import (
+    split_deps_string, split_constraint_string, decode_text, loads_toml)
 
 
 def test_split_deps_string():
@@ -16,3 +19,18 @@ def test_split_constraint_string():
     assert split_constraint_string("1.2.3") == ["==1.2.3"]
     assert split_constraint_string(">=1.2.3, <4.5.0, 4.5.6") == [
         ">=1.2.3", "<4.5.0", "==4.5.6"]
+
+
+def test_decode_text():
+    assert decode_text(b"foo\nbar") == "foo\nbar"
+    assert decode_text(b"foo\r\nbar\rbaz") == "foo\nbar\nbaz"
+    assert decode_text("café".encode("utf-8")) == "café"
+
+
+@pytest.mark.parametrize("use_fast_toml", [True, False])
+def test_loads_toml(optional_module, use_fast_toml):
+    optional_module("roo.parsing_utils.fast_toml", use_fast_toml)
+
+    assert loads_toml('[a]\nb = "c"\n') == {"a": {"b": "c"}}
+    with pytest.raises(ValueError):
+        loads_toml('[a]\nb = "c"\nb = "d"\n')